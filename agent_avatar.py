@@ -1,138 +1,155 @@
 # agent_avatar.py
-import os, time, tempfile, warnings, wave
+import os, tempfile, warnings
+from concurrent.futures import CancelledError, ThreadPoolExecutor
 from pathlib import Path
+from typing import Callable, Iterable, Iterator
 
 import numpy as np
-import whisper
 import sounddevice as sd
 from scipy.io.wavfile import write
 
-import os
 import openai 
-from elevenlabs import generate, play, Voice, VoiceSettings 
-
-from run_avatar import animate_avatar  
-
-import time 
-import numpy as np
-import subprocess 
 import streamlit as st
+import streamlit.components.v1 as components
 
-# SadTalker loader (make sure sadtalker_loader.py is correctly configured)
-from sadtalker_loader import sad_talker
+# heavy models (Whisper, SadTalker) load on first use, not at import
+import model_registry
+
+from render_worker import RESULTS_DIR, DEFAULT_SETTINGS, RenderSettings
+from render_quality import audio_seconds, get_quality_controller, idle_clip
+from media_cache import get_media_cache, tts_key, clip_key
+from sentence_stream import SentenceChunker, split_sentences
+from tts_backends import get_tts
+from job_scheduler import Job, get_scheduler
 
 warnings.filterwarnings("ignore", message="FP16 is not supported on CPU")
 
-# ── API KEYS & MODELS ─────────────────────────────────────────────
+# ── API KEYS & ASSETS ─────────────────────────────────────────────
 openai.api_key = os.getenv("OPENAI_API_KEY") or st.stop("OPENAI_API_KEY not set")
-os.environ["ELEVEN_API_KEY"] = os.getenv("ELEVEN_API_KEY", "")
 
-whisper_model = whisper.load_model("small")          # CPU model is fine
 AVATAR_IMG    = Path(__file__).resolve().parent / "assets" / "avatar.png"
+RENDER_TIMEOUT = 600                                 # seconds per SadTalker job
+SEGMENT_CHARS  = 120                                 # longer sentences split at clauses
+
 
 # ── MIC RECORDING ────────────────────────────────────────────────
+ASR_FS = 16_000                                      # what Whisper expects
+
 def record_audio(
-    filename="user_input.wav",
-    fs=16_000,
+    fs=ASR_FS,
     silence_thresh=0.008,
     silence_duration=1.2,
     max_record=60,
     device=None,
-):
-    """Record mic until the speaker pauses, write a WAV, return its path or None."""
-    ring_len = int(fs * silence_duration)
-    ring     = np.zeros(ring_len, dtype=np.float32)
-    frames, heard = [], False
-    t0 = time.time()
+    archive_path=None,
+) -> np.ndarray | None:
+    """
+    Record mic until the speaker pauses; return mono float32 PCM (or None).
+
+    Silence is judged on the mean |amplitude| of the last `silence_duration`
+    seconds, kept as a running sum over per-block energies (O(1) per block).
+    The audio stays in memory; a WAV is written only if `archive_path` is given.
+    """
+    blk_len  = int(fs * 0.1)
+    window   = max(1, round(silence_duration / 0.1))  # blocks in the silence window
+    energies = np.zeros(window, dtype=np.float64)     # per-block mean |x|, circular
+    running  = 0.0
+
+    out   = np.empty(int(fs * max_record) + blk_len, dtype=np.float32)
+    n, heard, since_voice, blocks = 0, False, 0, 0
+    wait_blocks    = int(10 / 0.1)                     # give up if silent for 10 s
+    silence_blocks = window
 
     try:
-        with sd.InputStream(samplerate=fs, channels=1, device=device) as stream:
+        with sd.InputStream(samplerate=fs, channels=1, dtype="float32",
+                            blocksize=blk_len, device=device) as stream:
             while True:
-                blk, _ = stream.read(int(fs * 0.1))
-                blk = blk.flatten()
-                ring = np.roll(ring, -len(blk))
-                ring[-len(blk):] = blk
-
-                if np.abs(ring).mean() > silence_thresh:
-                    heard = True
-                    frames.append(blk)
-                    last_voice = time.time()
-
-                if heard and (time.time() - last_voice) > silence_duration:
-                    break
-                if heard and (time.time() - t0) > max_record:
-                    break
-                if not heard and (time.time() - t0) > 10:
+                blk, _ = stream.read(blk_len)
+                blk = blk[:, 0]
+                e = float(np.abs(blk).mean())
+                i = blocks % window
+                running += e - energies[i]
+                energies[i] = e
+                blocks += 1
+
+                if running / window > silence_thresh:
+                    heard, since_voice = True, 0
+                elif heard:
+                    since_voice += 1
+
+                if heard:
+                    out[n:n + len(blk)] = blk
+                    n += len(blk)
+                    if since_voice > silence_blocks or n >= fs * max_record:
+                        break
+                elif blocks > wait_blocks:
                     return None
     except KeyboardInterrupt:
         return None
 
-    if not frames:
+    if not n:
         return None
 
-    write(filename, fs, np.concatenate(frames))
-    return filename
+    pcm = out[:n]
+    if archive_path:
+        write(archive_path, fs, pcm)
+    return pcm
 
 # ── ASR, GPT, TTS ────────────────────────────────────────────────
-def transcribe_audio(wav: str) -> str:
-    return whisper_model.transcribe(wav)["text"].strip()
+def transcribe_audio(audio) -> str:
+    """`audio`: float32 PCM at 16 kHz (fed straight to the model) or a file path."""
+    return model_registry.get("whisper").transcribe(audio)["text"].strip()
+
+def _reply_messages(prompt: str) -> list[dict]:
+    return [
+        {"role": "system",
+         "content": "You are a calm and professional job interviewer."},
+        {"role": "user", "content": prompt},
+    ]
 
 def ai_reply(prompt: str) -> str:
     resp = openai.chat.completions.create(
         model="gpt-4o-mini",
-        messages=[
-            {"role": "system",
-             "content": "You are a calm and professional job interviewer."},
-            {"role": "user", "content": prompt},
-        ],
+        messages=_reply_messages(prompt),
     )
     return resp.choices[0].message.content.strip()
 
-def tts_to_wav(text: str, wav_path: str):
-    """Generate speech with ElevenLabs and save as 24 kHz mono WAV."""
-    stream = generate(
-        text=text,
-        voice=Voice(
-            voice_id="UgBBYS2sOqTuMpoF3BR0",
-            settings=VoiceSettings(stability=0.5, similarity_boost=0.75),
-        ),
-        model="eleven_multilingual_v2",
+def ai_reply_stream(prompt: str) -> Iterator[str]:
+    """`ai_reply`, but yields each sentence as soon as it is complete."""
+    chunker = SentenceChunker(min_chars=12, clause_chars=10**9)
+    stream = openai.chat.completions.create(
+        model="gpt-4o-mini",
+        messages=_reply_messages(prompt),
+        stream=True,
     )
-    pcm_parts = [
-        (chunk if isinstance(chunk, (bytes, bytearray))
-         else np.asarray(chunk, dtype=np.int16).tobytes())
-        for chunk in stream
-    ]
-    with wave.open(wav_path, "wb") as wf:
-        wf.setnchannels(1)
-        wf.setsampwidth(2)       # 16-bit
-        wf.setframerate(24_000)
-        wf.writeframes(b"".join(pcm_parts))
+    for chunk in stream:
+        delta = chunk.choices[0].delta.content if chunk.choices else None
+        if delta:
+            yield from chunker.feed(delta)
+    if (rest := chunker.flush()):
+        yield rest
+
+def tts_to_wav(text: str, wav_path: str):
+    """Synthesize with the configured backend ($TTS_BACKEND) into a mono WAV."""
+    get_tts().to_wav(text, wav_path)
 
 # ── SadTalker wrapper ────────────────────────────────────────────
-def wav_to_mp4(wav_path: str) -> str:
-    """Run SadTalker and return the real MP4 path it produces."""
-    video_path = sad_talker.test(
-        str(AVATAR_IMG),     # source image
-        str(wav_path),       # driven audio
-        result_dir="results"
-    )
+def _render(wav_path: str, settings: RenderSettings) -> tuple[str, float]:
+    """(MP4 path, seconds the worker spent rendering it – queue wait excluded)."""
+    job = model_registry.get("sadtalker").submit(wav_path, AVATAR_IMG, result_dir=RESULTS_DIR,
+                                                 settings=settings)
+    mp4 = job.result(timeout=RENDER_TIMEOUT)
+    return mp4, job.render_s
 
-    play(audio)
-    
-def animate_avatar(audio_path, image_path="avatar.png", output_path="results/latest_animation.mp4"):
+def wav_to_mp4(wav_path: str, settings: RenderSettings = DEFAULT_SETTINGS) -> str:
+    """Submit to the warm SadTalker worker and return the MP4 path it produces."""
+    return _render(wav_path, settings)[0]
+
+def animate_avatar(audio_path, image_path=AVATAR_IMG, output_name="latest_animation"):
     print("Animating avatar...")
-    sadtalker_cmd = [
-        "python", "SadTalker/inference.py",
-        "--driven_audio", audio_path,
-        "--source_image", image_path,
-        "--result_dir", "results",
-        "--enhancer", "gfpgan",
-        "--preprocess", "full",
-        "--still",  # Static head pose
-        "--output_name", "latest_animation"
-    ]
-    subprocess.run(sadtalker_cmd, cwd="SadTalker")
+    job = model_registry.get("sadtalker").submit(audio_path, image_path,
+                                     result_dir=RESULTS_DIR, output_name=output_name)
+    output_path = job.result(timeout=RENDER_TIMEOUT)
     print(f"Animation saved to {output_path}")
     return output_path
 
@@ -140,46 +157,177 @@ def run_interview():
     print("Welcome to the AI Interviewer. Press Ctrl+C to quit.\n")
     while True:
         try:
-            audio_file = record_audio()
-            user_input = transcribe_audio(audio_file)
+            pcm = record_audio()
+            if pcm is None:
+                continue
+            user_input = transcribe_audio(pcm)
             ai_reply = get_ai_response(user_input)
-            speak(ai_reply)
+            job = speak(ai_reply).wait()
+            if job.error: raise job.error
         except KeyboardInterrupt:
             print("\nInterview ended.")
             break
         except Exception as e:
             print(f"Error: {e}")
-            
-    return video_path
 
-# ── Streamlit helpers ────────────────────────────────────────────
-def speak(text: str):
-    wav_path = tempfile.NamedTemporaryFile(suffix=".wav", delete=False).name
-    tts_to_wav(text, wav_path)
+# ── cached TTS + render ──────────────────────────────────────────
+def synth_clip(text: str, cancelled: Callable[[], bool] = lambda: False) -> tuple[str, str]:
+    """
+    (wav, mp4) for `text`, served from the media cache when already made.
+    A fresh render runs at the quality the latency controller picks
+    (render_quality.py); only top-quality clips are cached.  Raises
+    CancelledError instead of calling TTS / queueing a render once
+    `cancelled()` is true.
+    """
+    cache, quality = get_media_cache(), get_quality_controller()
+    top = quality.ladder[0]
+    wav_key = tts_key(text, get_tts().cache_id())
+    mp4_key = clip_key(wav_key, AVATAR_IMG, top.settings)
+
+    wav = cache.get(wav_key, "wav")
+    if wav is None:
+        if cancelled():
+            raise CancelledError
+        tmp = tempfile.NamedTemporaryFile(suffix=".wav", delete=False).name
+        tts_to_wav(text, tmp)
+        wav = cache.put(wav_key, "wav", tmp, move=True)
+
+    mp4 = cache.get(mp4_key, "mp4")
+    if mp4 is not None:
+        return str(wav), str(mp4)
+
+    if cancelled():
+        raise CancelledError
+    audio_s = audio_seconds(wav)
+    level = quality.choose(audio_s, model_registry.get("sadtalker").queue_depth())
+    if level.settings is None:
+        RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+        return str(wav), idle_clip(wav, RESULTS_DIR / f"idle_{wav_key[:16]}.mp4",
+                                   portrait=AVATAR_IMG)
+
+    mp4, render_s = _render(str(wav), level.settings)
+    quality.record(level, audio_s, render_s)        # queueing is predict()'s job
+    if level is top:
+        mp4 = cache.put(mp4_key, "mp4", mp4, move=True)     # no second copy in results/
+    return str(wav), str(mp4)
+
+# ── background speech jobs ───────────────────────────────────────
+# TTS + renders run on the shared job scheduler (bounded, fair across
+# sessions); speak / speak_stream return a Job at once and the UI polls
+# it with show_job.  Raises job_scheduler.SchedulerBusy when queues are full.
+_synth_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="synth")
+SYNTH_LOOKAHEAD = 2             # sentences per reply in flight on the shared pool
+
+def _speak_job(job: Job, sentences: Iterable[str]) -> str:
+    """Each sentence's TTS + render is submitted as it arrives, at most
+    SYNTH_LOOKAHEAD at a time so one long reply can't fill the shared pool
+    ahead of other sessions; every finished clip is published as soon as
+    the ones before it are, so playback starts after sentence one."""
+    texts, clips = [], []
+
+    def publish(max_inflight: int):
+        # push finished clips in order; block on the oldest while too many are out
+        while len(job.outputs) < len(clips) and not job.cancelled:
+            nxt = clips[len(job.outputs)]
+            if not nxt.done() and len(clips) - len(job.outputs) <= max_inflight:
+                return
+            try:
+                clip = nxt.result(timeout=RENDER_TIMEOUT)
+            except CancelledError:
+                if job.cancelled:                   # stopped while we waited on it
+                    return
+                raise
+            job.push(clip)
 
-    video_path = wav_to_mp4(wav_path)
+    try:
+        for sentence in sentences:
+            publish(SYNTH_LOOKAHEAD - 1)            # make room for this one
+            if job.cancelled:
+                break
+            texts.append(sentence)
+            clips.append(_synth_pool.submit(synth_clip, sentence, lambda: job.cancelled))
+            job.expect(len(clips))
+        publish(0)
+    finally:
+        if job.cancelled:                           # Stop: no TTS / renders for a dead interview
+            for clip in clips:
+                clip.cancel()
+    return " ".join(texts)
+
+
+def speak_stream(sentences: Iterable[str], *, session: str = "default") -> Job:
+    """Speak a reply that may still be being generated, in the background."""
+    return get_scheduler().submit(session, _speak_job, sentences)
+
+
+def speak(text: str, *, session: str = "default") -> Job:
+    """Speak a finished text, one clip per sentence (long ones split at clauses)."""
+    return speak_stream(split_sentences(text, clause_chars=SEGMENT_CHARS), session=session)
 
+
+# the sidebar's clips play back to back: when one ends the next starts,
+# or starts on arrival if playback caught up with rendering.  All state is
+# keyed by job id – the sidebar (and React's <video> elements) outlive a
+# reply, so a leftover "play clip N next" must not fire on the next one.
+_CHAIN_JS = """
+<script>
+const JOB = "__JOB__";
+const root = window.parent.document.querySelector('section[data-testid="stSidebar"]')
+          || window.parent.document.body;
+function wire() {
+  if (root.dataset.chainJob !== JOB) { root.dataset.chainJob = JOB; delete root.dataset.nextClip; }
+  root.querySelectorAll('video').forEach((v, i) => {
+    if (v.dataset.chained === JOB) return;
+    v.dataset.chained = JOB;
+    if (v._chainEnded) v.removeEventListener('ended', v._chainEnded);
+    v._chainEnded = () => {
+      if (root.dataset.chainJob !== JOB) return;
+      const next = root.querySelectorAll('video')[i + 1];
+      if (next) next.play(); else root.dataset.nextClip = JOB + ":" + (i + 1);
+    };
+    v.addEventListener('ended', v._chainEnded);
+    if (root.dataset.nextClip === JOB + ":" + i) { delete root.dataset.nextClip; v.play(); }
+  });
+}
+wire();
+new MutationObserver(wire).observe(root, {childList: true, subtree: true});
+</script>
+"""
+
+
+def show_job(job: Job):
+    """Render what a speech job has produced so far (call again to poll)."""
     with AVATAR_IMG.open("rb") as f:
         st.image(f.read(), width=250)
 
-    with open(video_path, "rb") as f:
-        st.video(f.read(), format="video/mp4")
-
-    with open(wav_path, "rb") as f:
-        st.audio(f.read(), format="audio/wav")
+    # one clip per sentence, each published as soon as it is rendered (the
+    # MP4s carry their own audio track); the first one starts on its own
+    for i, (_, video_path) in enumerate(job.snapshot()):
+        with open(video_path, "rb") as f:
+            st.video(f.read(), format="video/mp4", autoplay=(i == 0))
+    components.html(_CHAIN_JS.replace("__JOB__", str(job.id)), height=0)
 
-    st.markdown(f"**Interviewer:** {text}")
+    done, total = job.progress()
+    if job.state == "queued":
+        ahead = get_scheduler().position(job)
+        st.caption(f"Waiting for the renderer … ({ahead} ahead)" if ahead else "Starting …")
+    elif job.state == "running":
+        st.progress(done / total if total else 0.0, text=f"Rendering clip {done + 1}/{max(total, 1)} …")
+    elif job.state == "failed":
+        st.error(f"Speech failed: {job.error}")
+    if job.finished_ok:
+        st.markdown(f"**Interviewer:** {job.result}")
 
 
 # ── Streamlit front-end when run directly ───────────────────────
 if __name__ == "__main__":
     st.title("🎤 Live Job-Interview Avatar")
     if st.button("Record a question"):
-        wav_in = record_audio()
-        if wav_in:
-            you = transcribe_audio(wav_in)
+        pcm = record_audio()
+        if pcm is not None:
+            you = transcribe_audio(pcm)
             st.markdown(f"**You:** {you}")
-            speak(ai_reply(you))
+            show_job(speak(ai_reply(you)).wait())
         else:
             st.warning("No speech detected.")
 
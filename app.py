@@ -3,21 +3,25 @@ from __future__ import annotations
 
 # 3-party libs
 import streamlit as st
-import pdfminer.high_level as pdf
-import docx
-import spacy, wordfreq
-from spacy.matcher import PhraseMatcher
-from spacy.language import Language
 import os
-from agent_avatar import record_audio, transcribe_audio, get_ai_response, speak
+from agent_avatar import record_audio, transcribe_audio, speak, speak_stream, show_job
+from job_scheduler import SchedulerBusy, get_scheduler
+import model_registry
+from tts_backends import warm_models
 
 # helpers
-from llm_utils     import summarise_resume, summarise_jd, rank_skills
-from interview_llm import next_interview_question
+from doc_analysis  import analyse_uploads
+from interview_llm import stream_question_sentences
+from interview_memory import InterviewMemory
+from skill_extract import load_nlp, load_matcher, match_score, normalise_skills
+from skill_match import match_skills, matched_jd
+from rerun_profiler import RerunProfiler
 
 # stdlib
 from pathlib import Path
-import re, json
+import json, uuid
+
+prof = RerunProfiler("app")             # RERUN_PROFILE=1 → ms per section per run
 
 GREETING = "Hey there, I'm your AI Interviewer. Would you like to get started?"
 
@@ -37,200 +41,186 @@ st.markdown("""
 st.title("📄 Resume & Job-Description Parser")
 
 MAX_QUESTIONS = 5
+WARM_VOICE_MODELS = os.getenv("WARM_VOICE_MODELS", "1") == "1"
+SPEAK_POLL_S = 0.5                                          # panel refresh while rendering
+DOC_MAX_PAGES = int(os.getenv("DOC_MAX_PAGES", "20"))      # PDF pages read per upload
+DOC_MAX_CHARS = int(os.getenv("DOC_MAX_CHARS", "100000"))  # …or stop once this much text
 
 # ─── uploads ────────────────────────────────────────────────────
 resume_file = st.file_uploader("⇧ Upload Resume", ["pdf", "txt"], key="resume")
 jd_file     = st.file_uploader("⇧ Upload JD",     ["pdf", "txt", "docx"], key="jd")
 
-# ─── text extraction ────────────────────────────────────────────
-@st.cache_data(show_spinner=False)
-def extract_text(file) -> str:
-    if not file: return ""
-    suf = Path(file.name).suffix.lower()
-    if suf == ".txt":  return file.read().decode("utf-8", errors="ignore")
-    if suf == ".pdf":  return pdf.extract_text(file)
-    if suf == ".docx":
-        doc = docx.Document(file); return "\n".join(p.text for p in doc.paragraphs)
-    return ""
-
 # ─── spaCy bootstrap ────────────────────────────────────────────
-@st.cache_resource(show_spinner=False)
-def get_nlp() -> Language:
-    try: return spacy.load("en_core_web_sm")
-    except OSError:
-        with st.spinner("Downloading spaCy model …"):
-            from spacy.cli import download; download("en_core_web_sm")
-        return spacy.load("en_core_web_sm")
-
-# ─── matcher setup ──────────────────────────────────────────────
-STOP_WORDS = {*wordfreq.top_n_list("en", 2000),
-              *"january february march april … december".split(),
-              "responsibilities","summary","objective"}
-
-ACTION_VERBS = {"achieve","administer","advise","analyze","architect","build",
-    "collaborate","create","debug","define","design","develop","drive","enhance",
-    "establish","evaluate","execute","facilitate","implement","improve","lead",
-    "manage","optimize","organize","own","plan","prioritize","research","resolve",
-    "scale","support","test","troubleshoot","upgrade","validate","deliver",
-    "monitor","ensure","provide","partner","review"}
-
-TECH_GAZETTE = ["Python","Java","JavaScript","SQL","PostgreSQL","MySQL","AWS",
-    "GCP","Docker","Kubernetes","Terraform","Pandas","NumPy","React","FastAPI",
-    "Django"]
-
-CLEAN_SUFFIXES = (" programming"," development"," developer"," engineer",
-                  " language"," framework"," library")
-
 @st.cache_resource(show_spinner=False)
 def get_matchers():
-    nlp = get_nlp()
-    pm  = PhraseMatcher(nlp.vocab, attr="LOWER")
-    pm.add("TECH", [nlp.make_doc(t) for t in TECH_GAZETTE])
-    return nlp, pm
-
-# ─── extraction helpers ─────────────────────────────────────────
-def _norm(skill:str)->str:
-    s = skill.rstrip(".,;:- ").lower()
-    for suf in CLEAN_SUFFIXES:
-        if s.endswith(suf): s = s[:-len(suf)]
-    return s.strip()
-
-def _pretty(s:str)->str: return s.replace("_"," ").replace("-"," ").title()
-
-def extract_skills(text:str)->set[str]:
-    nlp,pm = get_matchers(); doc = nlp(text)
-    skills = {doc[s:e].text for _,s,e in pm(doc)}
-    sec = re.search(r"(?i)skills?\s*[:-–]\s*(.+)", text.replace("\n"," "))
-    if sec: skills.update(re.split(r"[·•,;/]", sec.group(1)))
-    if doc.has_annotation("DEP"):
-        for ch in doc.noun_chunks:
-            if 1<=len(ch)<=3 and (ch.text.istitle() or
-               re.fullmatch(r"[A-Z0-9+#\-.]{2,}", ch.text)):
-                skills.add(ch.text)
-    return {_pretty(s) for s in (_norm(t) for t in skills)
-            if 2<len(s)<30 and s not in STOP_WORDS}
-
-def extract_bullets(text:str)->list[str]:
-    bullets=[]; clean=text.replace("\xa0"," ")
-    rx = re.compile(r"^[ \t]*(?:[-–—•*]|[\u2022-\u2024])[ \t]*(.+?)(?=\n|$)", re.M)
-    bullets+= [l.strip() for l in rx.findall(clean)]
-    if len(bullets)<10:
-        sent_rx=re.compile(r"^[A-Z][^.\n]{10,150}$", re.M)
-        for line in sent_rx.findall(clean):
-            if line.split()[0].lower().rstrip("s,.;") in ACTION_VERBS:
-                bullets.append(line);  
-            if len(bullets)>=60: break
-    if len(bullets)<10:
-        head_rx=re.compile(r"^[ \t]*(?:[-–—•*]|[\u2022-\u2024])?[ \t]*"
-                           r"[A-Z][A-Za-z0-9 &/()+\-]{2,50}:\s+.+", re.M)
-        for m in head_rx.findall(clean):
-            line=m.strip(); 
-            if line not in bullets: bullets.append(line)
-            if len(bullets)>=60: break
-    return bullets[:60]
-
-# ─── LLM summary wrappers ───────────────────────────────────────
-@st.cache_data(show_spinner=False)
-def _sum_resume(t:str)->str: return summarise_resume(t)
-@st.cache_data(show_spinner=False)
-def _sum_jd(t:str)->str:     return summarise_jd(t)
-
-# ═════════════════════════ main logic ══════════════════════════
-if resume_file and jd_file:
-    st.success("Files received — parsing …")
-    res_txt = extract_text(resume_file)
-    jd_txt  = extract_text(jd_file)
-
-    # summaries (used for prompt!)
-    res_summary = _sum_resume(res_txt)
-    jd_summary  = _sum_jd(jd_txt)
-
-    with st.spinner("Ranking top-5 skills …"):
-        res_sk = set(rank_skills(extract_skills(res_txt), res_txt))
-        jd_sk  = set(rank_skills(extract_skills(jd_txt), jd_txt))
-    overlap = sorted(res_sk & jd_sk, key=str.lower)
-
-    # ─── interview state ────────────────────────────────────────
-    if "chat" not in st.session_state:   st.session_state.chat=[]
-    if "q_count" not in st.session_state:st.session_state.q_count=0
-
-
-
-    with st.sidebar.expander("🎙 Live interview", expanded=False):
+    with st.spinner("Loading spaCy model …"):
+        nlp = load_nlp()
+    return nlp, load_matcher()
+
+# ─── document analysis ──────────────────────────────────────────
+# text, skills, bullets, summary and top-5 per upload, keyed on the bytes
+# (a renamed copy is not parsed again) and persisted by doc_analysis, so
+# reruns, new sessions and worker restarts skip spaCy and the LLM
+@st.cache_data(show_spinner=False, max_entries=64)
+def _analyse(res_data:bytes, res_suffix:str, jd_data:bytes, jd_suffix:str):
+    nlp, matcher = get_matchers()
+    return analyse_uploads([(res_data, res_suffix, "resume"), (jd_data, jd_suffix, "jd")],
+                           nlp, matcher, max_pages=DOC_MAX_PAGES, max_chars=DOC_MAX_CHARS)
+
+# ─── live interview panel ───────────────────────────────────────
+# A fragment: its buttons re-execute only this function, so a voice turn
+# re-sends the transcript and the new clips, not the previews / parsed
+# tabs below.  While a speech job is pending it also re-runs itself every
+# SPEAK_POLL_S (run_every); that is only set when the fragment is
+# registered on a full run, so starting / stopping the polling costs one.
+_fragment = getattr(st, "fragment", None) or st.experimental_fragment
+
+def _speech_pending() -> bool:
+    job = st.session_state.get("speech")
+    return job is not None and not job.done()
+
+def _say(start):
+    """Queue a speech job on the shared scheduler; False (and a notice) when busy."""
+    try:
+        st.session_state.speech = start()
+        return True
+    except SchedulerBusy:
+        st.warning("The avatar renderer is busy with other interviews — "
+                   "try again in a moment.")
+        return False
+
+def interview_panel(res_summary:str, jd_summary:str):
+    st.session_state.speech_polling = _speech_pending()
+    every = SPEAK_POLL_S if st.session_state.speech_polling else None
+    _fragment(run_every=every)(_interview_fragment)(res_summary, jd_summary)
+
+def _interview_fragment(res_summary:str, jd_summary:str):
+    prof = RerunProfiler("interview")
+    try:
+        _interview_panel(res_summary, jd_summary, prof)
+    finally:
+        prof.report()
+    if st.session_state.speech_polling != _speech_pending():
+        st.rerun()                      # a job started or finished: re-register run_every
+
+def _interview_panel(res_summary:str, jd_summary:str, prof:RerunProfiler):
+    # ── warm Whisper + SadTalker (+ local TTS) in the background, once per session ──
+    if WARM_VOICE_MODELS and "models_warming" not in st.session_state:
+        model_registry.warm("whisper", "sadtalker", *warm_models())
+        st.session_state.models_warming = True
 
     # ── session keys ───────────────────────────────────────────────
-        if "voice_on"       not in st.session_state: st.session_state.voice_on = False
-        if "await_answer"   not in st.session_state: st.session_state.await_answer = False
-        if "greeted"        not in st.session_state: st.session_state.greeted = False
-        if "chat"           not in st.session_state: st.session_state.chat = []   
-        if "last_ai_q"      not in st.session_state: st.session_state.last_ai_q = ""
+    if "voice_on"       not in st.session_state: st.session_state.voice_on = False
+    if "await_answer"   not in st.session_state: st.session_state.await_answer = False
+    if "greeted"        not in st.session_state: st.session_state.greeted = False
+    if "chat"           not in st.session_state: st.session_state.chat = []
+    if "last_ai_q"      not in st.session_state: st.session_state.last_ai_q = ""
+    if "memory"         not in st.session_state: st.session_state.memory = InterviewMemory()
+    if "sid"            not in st.session_state: st.session_state.sid = uuid.uuid4().hex
+    if "speech"         not in st.session_state: st.session_state.speech = None
 
     # ── start/stop buttons ───────────────────────────────────────
-        cols = st.columns(2)
-        if cols[0].button("▶ Start Voice Interview", disabled=st.session_state.voice_on):
-            st.session_state.voice_on = True
-            st.session_state.greeted = False        
+    cols = st.columns(2)
+    if cols[0].button("▶ Start Voice Interview", disabled=st.session_state.voice_on):
+        st.session_state.voice_on = True
+        st.session_state.greeted = False
 
-        if cols[1].button("⏹ Stop Voice Interview", disabled=not st.session_state.voice_on):
-            st.session_state.voice_on = False
-            st.session_state.await_answer = False
-            st.session_state.greeted = False
+    if cols[1].button("⏹ Stop Voice Interview", disabled=not st.session_state.voice_on):
+        st.session_state.voice_on = False
+        st.session_state.await_answer = False
+        st.session_state.greeted = False
+        get_scheduler().cancel_session(st.session_state.sid)
+        st.session_state.speech = None
 
-        st.divider()
+    st.divider()
 
     # ── display full script updated ───────────────────────────────
+    with prof.section("transcript"):
         for turn in st.session_state.chat:
             st.markdown(f"**Interviewer:** {turn['q']}")
             st.markdown(f"**You:** {turn['a']}")
             st.divider()
 
     # ── live interview flow ────────────────────────────────────────
-        if st.session_state.voice_on:
-
-        # greet
-            if not st.session_state.greeted:
-                st.markdown(f"**Interviewer:** {GREETING}")
-                speak(GREETING)
-                st.session_state.last_ai_q = GREETING
-                st.session_state.await_answer = True
-                st.session_state.greeted = True
-                st.rerun()   
-
-
-        
-            if st.session_state.await_answer and st.button("Click to Speak"):
-                wav = record_audio(device=None)
-                if not wav:
-                    st.error("Recording timed out—please try again.")
-                    st.stop()
-
-                user_text = transcribe_audio(wav)
-                st.session_state.chat.append({"q": st.session_state.last_ai_q, "a": user_text})
-                st.session_state.await_answer = False
-
-                next_q = get_ai_response(user_text)
-                st.session_state.last_ai_q = next_q
+    if not st.session_state.voice_on:
+        return
+
+    # greet
+    if not st.session_state.greeted:
+        if _say(lambda: speak(GREETING, session=st.session_state.sid)):
+            st.session_state.await_answer = True
+            st.session_state.greeted = True
+
+    # speech renders in the background; run_every re-runs this panel to poll it
+    job = st.session_state.speech
+    if job is not None:
+        with prof.section("speak"):
+            show_job(job)
+        if job.finished_ok:
+            st.session_state.last_ai_q = job.result
+
+    speaking = job is not None and not job.done()
+    if st.session_state.await_answer and st.button("Click to Speak", disabled=speaking):
+        if not get_scheduler().accepts(st.session_state.sid):     # nobody could ask the next question
+            st.warning("The avatar renderer is busy with other interviews — "
+                       "try again in a moment.")
+            st.stop()
+        with prof.section("record"):
+            pcm = record_audio(device=None)
+        if pcm is None:
+            st.error("Recording timed out—please try again.")
+            st.stop()
+
+        with prof.section("transcribe"):
+            user_text = transcribe_audio(pcm)
+        st.session_state.chat.append({"q": st.session_state.last_ai_q, "a": user_text})
+        st.session_state.memory.add_turn(st.session_state.last_ai_q, user_text)
+
+        # the acknowledgement is synthesized while the follow-up
+        # question is still being generated; renders the avatar videos
+        if not _say(lambda: speak_stream(stream_question_sentences(
+                res_summary, jd_summary, memory=st.session_state.memory),
+                session=st.session_state.sid)):
+            st.session_state.chat.pop()                 # lost the race: answer again later
+            st.session_state.memory.drop_last_turn()
+            st.stop()
 
-                # this will render your animated avatar video
-                speak(next_q)
+# ═════════════════════════ main logic ══════════════════════════
+if resume_file and jd_file:
+    st.success("Files received — parsing …")
+    # summaries (used for prompt!) + top-5 skills
+    with st.spinner("Summarising & ranking top-5 skills …"), prof.section("analysis"):
+        res_doc, jd_doc = _analyse(
+            resume_file.getvalue(), Path(resume_file.name).suffix.lower(),
+            jd_file.getvalue(), Path(jd_file.name).suffix.lower())
+    res_txt, jd_txt = res_doc.text, jd_doc.text
+    res_summary, jd_summary = res_doc.summary, jd_doc.summary
+    # LLM picks come back as free text: map "Postgres" / "k8s" to canonical names
+    res_sk, jd_sk = normalise_skills(res_doc.top_skills), normalise_skills(jd_doc.top_skills)
+    with prof.section("overlap"):
+        matches = match_skills(res_sk, jd_sk)      # fuzzy: "Postgres" ≈ "PostgreSQL"
+        overlap = matched_jd(matches)
 
-                st.session_state.await_answer = True
-                st.rerun()
+    # ─── interview state ────────────────────────────────────────
+    if "chat" not in st.session_state:   st.session_state.chat=[]
+    if "q_count" not in st.session_state:st.session_state.q_count=0
 
 
 
+    with st.sidebar.expander("🎙 Live interview", expanded=False), prof.section("interview"):
+        interview_panel(res_summary, jd_summary)
 
     # ─── tabs ───────────────────────────────────────────────────
     raw_tab, parsed_tab = st.tabs(["📑 Previews","🔎 Parsed"])
 
-    with raw_tab:
+    with raw_tab, prof.section("previews"):
         c1,c2 = st.columns(2)
         c1.subheader("Résumé (first 2000 chars)")
         c1.text_area("", res_txt[:2000], height=280, label_visibility="collapsed")
         c2.subheader("JD (first 2000 chars)")
         c2.text_area("", jd_txt[:2000], height=280, label_visibility="collapsed")
 
-    with parsed_tab:
+    with parsed_tab, prof.section("parsed"):
         c1,c2 = st.columns(2); c1.write(res_summary); c2.write(jd_summary); st.divider()
 
         l,r = st.columns(2)
@@ -244,18 +234,20 @@ if resume_file and jd_file:
             else: col.caption("— none detected —")
 
         l.subheader("📌 Résumé bullets")
-        for b in extract_bullets(res_txt): l.markdown(f"- {b}")
+        for b in res_doc.bullets: l.markdown(f"- {b}")
         r.subheader("📌 JD responsibilities")
-        for b in extract_bullets(jd_txt):  r.markdown(f"- {b}")
+        for b in jd_doc.bullets:  r.markdown(f"- {b}")
 
         st.subheader(f"🎯 Skill overlap ({len(overlap)})")
         if overlap:
-            st.markdown(" ".join(f"<span class='token token-hit'>{s}</span>" for s in overlap),
-                        unsafe_allow_html=True)
+            st.markdown(" ".join(
+                f"<span class='token token-hit' title='{m.score:.2f}'>{m.jd}"
+                + (f" ≈ {m.resume}" if m.resume != m.jd else "") + "</span>"
+                for m in sorted(matches, key=lambda m: m.jd.lower())), unsafe_allow_html=True)
         else: st.caption("No overlap yet — maybe refine the gazetteer?")
 
         if jd_sk:
-            st.metric("Match score", f"{int(100*len(overlap)/len(jd_sk))}%")
+            st.metric("Match score", f"{match_score(overlap, jd_sk)}%")
 
         if st.button("📥 Download summaries & skill-match", key="dl_btn"):
             fn="resume_jd_summary.json"
@@ -263,8 +255,11 @@ if resume_file and jd_file:
                 json.dump({
                     "resume_summary":res_summary,"jd_summary":jd_summary,
                     "resume_skills":sorted(res_sk),"jd_skills":sorted(jd_sk),
-                    "overlap":overlap}, f, indent=2)
+                    "overlap":overlap,
+                    "matches":[vars(m) for m in matches]}, f, indent=2)
             with open(fn,"rb") as f: st.download_button("Download JSON", f, file_name=fn,
                                                         mime="application/json")
 else:
     st.warning("⬆️ Please upload **both** files to continue.")
+
+prof.report()
@@ -1,55 +1,96 @@
 # avatar_main.py
 # --------------------------------------------------------------
-# Mic → faster-whisper (CPU)  → GPT-4o-mini (stream) → ElevenLabs TTS (stream)
+# Mic → faster-whisper (CPU)  → GPT-4o-mini (stream) → TTS (stream; $TTS_BACKEND)
 #        (ASR)                     (LLM)                   (audio chunks)
 # --------------------------------------------------------------
-import asyncio, os, time, sounddevice as sd, numpy as np, tempfile, sys
-from scipy.io.wavfile import write
+import asyncio, os, time, sounddevice as sd, numpy as np, sys
+from concurrent.futures import ThreadPoolExecutor
 from faster_whisper import WhisperModel
 from openai import AsyncOpenAI
-from elevenlabs import ElevenLabs
+import model_registry
+from sentence_stream import SentenceChunker
+from utterance_segmenter import UtteranceSegmenter, EnergyVAD
+from streaming_asr import StreamingTranscriber, ASREvent
+from tts_backends import BACKEND, get_tts, warm_models
 # --------------------------------------------------------------
 # ▶ CONFIG
 FS            = 16_000              # sample-rate
 BLOCK         = 1024                # mic read size (64 ms)
 PAUSE_MS      = 600                 # silence ≥0.6s ⇒ end of turn
+PREROLL_MS    = 300                 # audio kept from before speech onset
+MAX_UTTER_S   = 30                  # longest single answer kept in one piece
 WHISPER_SIZE  = "small"             # tiny / small / base …
-VAD_THRESH    = 1500                # tweak if you get false positives
+VAD_START_DB  = 12                  # dB above noise floor ⇒ speech (raise on false positives)
+ASR_STEP_MS   = 1000                # re-decode the open window this often (0 = off)
+TTS_MIN_CHARS = 20                  # don't synthesize fragments shorter than this
+TTS_LOOKAHEAD = 2                   # TTS requests in flight (sentences synthesized at once)
+LAG_TICK      = 0.05                # loop-lag probe interval (s)
+LAG_REPORT_S  = 10                  # print loop-lag stats this often
 # --------------------------------------------------------------
 # ▶ QUEUES
 llm_queue  : asyncio.Queue[str] = asyncio.Queue()  # ASR ➜ GPT
 tts_queue  : asyncio.Queue[str] = asyncio.Queue()  # GPT ➜ TTS
 audio_q    : asyncio.Queue[bytes] = asyncio.Queue()# TTS ➜ player
+mic_q      : asyncio.Queue[np.ndarray] = asyncio.Queue()  # PortAudio thread ➜ mic_loop
+asr_events : asyncio.Queue[ASREvent] = asyncio.Queue()    # partial / final transcripts
 # --------------------------------------------------------------
-# ▶ ASR  (1-second rolling buffer, CPU int8)
+# ▶ BLOCKING WORK lives on its own threads, never on the event loop
+asr_pool  = ThreadPoolExecutor(max_workers=1, thread_name_prefix="asr")
+play_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="playback")
+# --------------------------------------------------------------
+# ▶ ASR  (streaming: partials while speaking, final = last window only; CPU int8)
 whisper_model = WhisperModel(WHISPER_SIZE, device="cpu", compute_type="int8")
+stream_asr    = StreamingTranscriber(whisper_model, FS)   # only touched on asr_pool
 
 async def mic_loop():
-    buf = np.empty(0, dtype=np.int16)
-    last_voice = time.time()
+    loop = asyncio.get_running_loop()
+
+    def on_block(indata, frames, t, status):          # PortAudio thread
+        pcm = np.frombuffer(indata, dtype=np.int16).copy()
+        loop.call_soon_threadsafe(mic_q.put_nowait, pcm)
+
+    async def partial(view: np.ndarray):
+        await asr_events.put(await loop.run_in_executor(asr_pool, stream_asr.update, view))
+
+    # counts samples, not wall-clock, so blocks queued during ASR are timed right
+    segmenter = UtteranceSegmenter(FS, max_s=MAX_UTTER_S, preroll_ms=PREROLL_MS,
+                                   hangover_ms=PAUSE_MS,
+                                   vad=EnergyVAD(start_db=VAD_START_DB, fs=FS))
+    step = FS * ASR_STEP_MS // 1000
+    next_step, inflight = step, None
 
-    with sd.RawInputStream(samplerate=FS, blocksize=BLOCK, dtype="int16") as mic:
+    with sd.RawInputStream(samplerate=FS, blocksize=BLOCK, dtype="int16",
+                           callback=on_block):
         while True:
-            block, _ = mic.read(BLOCK)
-            pcm      = np.frombuffer(block, dtype=np.int16)
-            buf      = np.concatenate([buf, pcm])[-FS:]       # keep ≤1 s
+            was_speaking = segmenter.in_speech
+            utterance = segmenter.push(await mic_q.get())
 
-            if np.abs(pcm).mean() > VAD_THRESH:               # simple VAD
-                last_voice = time.time()
+            if utterance is None:
+                if was_speaking and not segmenter.in_speech:   # too short, dropped
+                    loop.run_in_executor(asr_pool, stream_asr.reset)
+                    next_step = step
+                # one partial decode at a time; skip a step rather than queue up
+                elif step and segmenter.samples >= next_step and \
+                        (inflight is None or inflight.done()):
+                    next_step = segmenter.samples + step
+                    inflight = asyncio.create_task(partial(segmenter.current()))
+                continue
 
-            if time.time() - last_voice > PAUSE_MS/1000:
-                if buf.any():
-                    wav = tempfile.NamedTemporaryFile(suffix=".wav", delete=False).name
-                    write(wav, FS, buf)
-                    segs, _ = whisper_model.transcribe(wav, beam_size=1)
-                    os.remove(wav)
+            # asr_pool is single-threaded, so this runs after any partial in flight;
+            # the view stays valid until the segmenter closes the next utterance
+            final = await loop.run_in_executor(asr_pool, stream_asr.finish, utterance)
+            next_step = step
+            await asr_events.put(final)
 
-                    text = "".join(s.text for s in segs).strip()
-                    if text:
-                        print(f"\n✅ {text}")
-                        await llm_queue.put(text)
-                buf = np.empty(0, dtype=np.int16)
-                last_voice = time.time()
+async def asr_event_loop():
+    """Partials go to the console; finals start the LLM turn."""
+    while True:
+        ev = await asr_events.get()
+        if ev.kind == "partial":
+            print(f"\r… {ev.text}", end="", flush=True)
+        elif ev.text:
+            print(f"\r✅ {ev.text}")
+            await llm_queue.put(ev.text)
 # --------------------------------------------------------------
 # ▶ GPT  (token stream)
 openai_client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY") or sys.exit("OPENAI_API_KEY not set"))
@@ -74,41 +115,89 @@ async def llm_loop():
                 await tts_queue.put(delta)                # hand tokens to TTS
         await tts_queue.put("<eos>")                      # mark done
 # --------------------------------------------------------------
-# ▶ TTS  (ElevenLabs stream → bytes → audio_q)
-el_client = ElevenLabs(api_key=os.getenv("ELEVEN_API_KEY") or sys.exit("ELEVEN_API_KEY not set"))
-VOICE_ID  = "JBFqnCBsd6RMkjVDRZzb"   # pick any
+# ▶ TTS  (sentence-at-a-time backend stream → 16-bit PCM → audio_q)
+if BACKEND == "elevenlabs":
+    os.getenv("ELEVEN_API_KEY") or sys.exit("ELEVEN_API_KEY not set")
+    tts = get_tts(voice_id="JBFqnCBsd6RMkjVDRZzb", settings={}, sample_rate=FS)  # pick any voice
+else:
+    tts = get_tts()
+    model_registry.warm(*warm_models())     # local model loads while the mic starts
+
+segment_q : asyncio.Queue[asyncio.Queue] = asyncio.Queue()  # per-sentence audio, in order
+
+async def synth_sentence(text: str, out: asyncio.Queue, slots: asyncio.Semaphore):
+    """Stream one sentence into its own queue; None marks the end."""
+    try:
+        async for chunk in tts.astream(text):
+            await out.put(chunk)
+    finally:
+        await out.put(None)
+        slots.release()
 
 async def tts_loop():
-    sentence = ""
+    chunker = SentenceChunker(min_chars=TTS_MIN_CHARS)
+    slots   = asyncio.Semaphore(TTS_LOOKAHEAD)
     while True:
         token = await tts_queue.get()
-        if token == "<eos>":                           # flush sentence
-            if sentence.strip():
-                async for chunk in el_client.text_to_speech.stream(
-                        voice_id=VOICE_ID,
-                        text=sentence,
-                        model_id="eleven_multilingual_v2",
-                        output_format="pcm_16000"):
-                    await audio_q.put(chunk)
-            sentence = ""
+        if token == "<eos>":
+            rest = chunker.flush()
+            sentences = [rest] if rest else []
         else:
-            sentence += token
+            sentences = chunker.feed(token)
+        for text in sentences:
+            await slots.acquire()                      # bound the lookahead
+            out: asyncio.Queue[bytes | None] = asyncio.Queue()
+            await segment_q.put(out)                   # reserve its playback slot
+            asyncio.create_task(synth_sentence(text, out, slots))
+
+async def sequencer():
+    """Drain sentence queues strictly in order: N+1 synthesizes while N plays."""
+    while True:
+        seg = await segment_q.get()
+        while (chunk := await seg.get()) is not None:
+            await audio_q.put(chunk)
 # --------------------------------------------------------------
 # ▶ Local speaker playback
 async def audio_player():
-    with sd.RawOutputStream(samplerate=FS, blocksize=2048,
+    loop = asyncio.get_running_loop()
+    # a local backend learns its rate from the model: may block for the load
+    rate = await loop.run_in_executor(None, lambda: tts.sample_rate)
+    with sd.RawOutputStream(samplerate=rate, blocksize=2048,
                             channels=1, dtype='int16') as spk:
         while True:
             data = await audio_q.get()
-            spk.write(data)
+            await loop.run_in_executor(play_pool, spk.write, data)  # write() blocks
+# --------------------------------------------------------------
+# ▶ Loop-lag probe: how late does a LAG_TICK sleep wake up?
+#   Near-zero lag while ASR / TTS / playback are busy ⇒ the stages overlap.
+async def loop_lag_monitor():
+    lags: list[float] = []
+    last_report = time.perf_counter()
+    while True:
+        t0 = time.perf_counter()
+        await asyncio.sleep(LAG_TICK)
+        now = time.perf_counter()
+        lags.append(now - t0 - LAG_TICK)
+
+        if now - last_report >= LAG_REPORT_S:
+            lags.sort()
+            print(f"\n⏱ loop lag ms  p50={lags[len(lags)//2]*1e3:.1f} "
+                  f"p99={lags[int(len(lags)*.99)]*1e3:.1f} max={lags[-1]*1e3:.1f}  "
+                  f"queues mic={mic_q.qsize()} llm={llm_queue.qsize()} "
+                  f"tts={tts_queue.qsize()} audio={audio_q.qsize()}", file=sys.stderr)
+            lags.clear()
+            last_report = now
 # --------------------------------------------------------------
 # ▶ MAIN
 async def main():
     await asyncio.gather(
-        mic_loop(),        # mic → llm_queue
+        mic_loop(),        # mic → asr_events
+        asr_event_loop(),  # asr_events → console / llm_queue
         llm_loop(),        # llm_queue → tts_queue
-        tts_loop(),        # tts_queue → audio_q
+        tts_loop(),        # tts_queue → per-sentence synth tasks
+        sequencer(),       # sentence audio, in order → audio_q
         audio_player(),    # audio_q  → speakers
+        loop_lag_monitor(),
     )
 
 if __name__ == "__main__":
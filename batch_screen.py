@@ -0,0 +1,166 @@
+"""
+Headless résumé screening: one JD against a folder of résumés.
+
+    python batch_screen.py JD.pdf resumes/ -o ranked.csv
+    python batch_screen.py JD.docx resumes/ -o ranked.jsonl --workers 8 --n-process 2
+
+Text extraction runs in a process pool and streams into a single
+`nlp.pipe` (its own `n_process` / `batch_size`).  Every scored candidate is
+appended to <output>.progress.jsonl as soon as it is done, so re-running
+the same command after an interruption skips what is already scored
+(rows are keyed by file, JD content, taxonomy and `--min-sim`, so a
+different JD or threshold re-scores everything).
+The score is % of the JD's extracted skills found among the résumé's,
+where a JD skill counts as found if a résumé skill is similar enough
+(`--min-sim`, char n-gram cosine; 1.0 = same skill or taxonomy alias).  Unlike the
+app's "Match score" it compares every extracted skill, not the LLM top-5,
+so no LLM call is made per résumé.
+"""
+from __future__ import annotations
+
+import argparse, csv, hashlib, json, multiprocessing as mp, os, sys, time
+from pathlib import Path
+
+from doc_text import SUPPORTED, extract_text_path
+from skill_extract import load_nlp, load_matcher, extract_skills, skills_from_doc, match_score
+from skill_match import THRESHOLD, JDMatcher, matched_jd
+
+
+def _file_id(path: Path, run: str) -> str:
+    st = path.stat()
+    return f"{path.resolve()}:{st.st_size}:{st.st_mtime_ns}:{run}"
+
+
+def _run_key(jd_path: Path, matcher, min_sim: float) -> str:
+    """Everything besides the résumé that changes a row."""
+    blob = json.dumps([hashlib.sha256(jd_path.read_bytes()).hexdigest(),
+                       getattr(matcher, "source_sha", ""), min_sim])
+    return hashlib.sha256(blob.encode()).hexdigest()[:16]
+
+
+def _read(path: str) -> tuple[str, str, str | None]:
+    """Pool worker: (path, text, error)."""
+    try:
+        return path, extract_text_path(path), None
+    except Exception as e:
+        return path, "", f"{type(e).__name__}: {e}"
+
+
+def _load_progress(progress: Path) -> dict[str, dict]:
+    done = {}
+    if progress.exists():
+        for line in progress.read_text(encoding="utf-8").splitlines():
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:          # torn last line of a killed run
+                continue
+            done[row["id"]] = row
+    return done
+
+
+class _Progress:
+    def __init__(self, total: int, already: int):
+        self.total, self.n, self.t0 = total, already, time.perf_counter()
+        self.new = 0
+
+    def tick(self):
+        self.n += 1; self.new += 1
+        if self.new % 10 == 0 or self.n == self.total:
+            rate = self.new / max(time.perf_counter() - self.t0, 1e-9)
+            eta = (self.total - self.n) / rate if rate else 0
+            print(f"\r[{self.n:>6}/{self.total}] {rate:6.1f} docs/s  eta {eta:5.0f}s",
+                  end="", file=sys.stderr, flush=True)
+
+
+def screen(jd_path: Path, folder: Path, out: Path, *, workers: int, n_process: int,
+           batch_size: int, min_sim: float = THRESHOLD) -> list[dict]:
+    nlp = load_nlp(); matcher = load_matcher()
+    jd_sk = extract_skills(extract_text_path(jd_path), nlp, matcher)
+    if not jd_sk:
+        sys.exit(f"no skills detected in {jd_path}")
+    jd_match = JDMatcher(jd_sk, threshold=min_sim)      # JD side embedded once
+
+    files = sorted(p for p in folder.rglob("*") if p.suffix.lower() in SUPPORTED)
+    progress_path = out.with_name(out.name + ".progress.jsonl")
+    done = _load_progress(progress_path)
+    run = _run_key(jd_path, matcher, min_sim)
+    ids = {str(p): _file_id(p, run) for p in files}
+    todo = [str(p) for p in files if ids[str(p)] not in done]
+    print(f"{len(files)} résumés, {len(files) - len(todo)} already scored, "
+          f"{len(jd_sk)} JD skills", file=sys.stderr)
+
+    bar = _Progress(len(files), len(files) - len(todo))
+    with progress_path.open("a", encoding="utf-8") as log, \
+         mp.get_context("spawn").Pool(workers) as pool:
+
+        def record(row: dict):
+            done[row["id"]] = row
+            log.write(json.dumps(row, ensure_ascii=False) + "\n"); log.flush()
+            bar.tick()
+
+        def texts():                                # good texts → nlp.pipe, failures logged
+            for path, text, err in pool.imap(_read, todo, chunksize=4):
+                if err or not text.strip():
+                    record({"id": ids[path], "file": path, "score": 0, "overlap": [],
+                            "missing": sorted(jd_sk, key=str.lower), "fuzzy": [], "n_skills": 0,
+                            "error": err or "empty text"})
+                else:
+                    yield text, path
+
+        for doc, path in nlp.pipe(texts(), as_tuples=True, batch_size=batch_size,
+                                  n_process=n_process):
+            sk = skills_from_doc(doc, matcher)
+            matches = jd_match.match(sk)
+            overlap = matched_jd(matches)
+            record({"id": ids[path], "file": path, "score": match_score(overlap, jd_sk),
+                    "overlap": overlap, "missing": sorted(jd_sk - set(overlap), key=str.lower),
+                    "fuzzy": [f"{m.resume} ≈ {m.jd} ({m.score:.2f})"
+                              for m in matches if m.resume != m.jd],
+                    "n_skills": len(sk), "error": None})
+    print(file=sys.stderr)
+
+    current = set(ids.values())
+    rows = [r for r in done.values() if r["id"] in current]
+    rows.sort(key=lambda r: (-r["score"], -len(r["overlap"]), r["file"]))
+    return rows
+
+
+def write_results(rows: list[dict], out: Path):
+    if out.suffix.lower() == ".jsonl":
+        with out.open("w", encoding="utf-8") as f:
+            for rank, r in enumerate(rows, 1):
+                f.write(json.dumps({"rank": rank, **{k: v for k, v in r.items() if k != "id"}},
+                                   ensure_ascii=False) + "\n")
+        return
+    with out.open("w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(["rank", "file", "score", "overlap_count", "overlap", "missing",
+                    "fuzzy", "n_skills", "error"])
+        for rank, r in enumerate(rows, 1):
+            w.writerow([rank, r["file"], r["score"], len(r["overlap"]),
+                        "; ".join(r["overlap"]), "; ".join(r["missing"]),
+                        "; ".join(r.get("fuzzy", [])), r["n_skills"], r["error"] or ""])
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("jd", type=Path, help="job description (pdf / txt / docx)")
+    ap.add_argument("folder", type=Path, help="folder of résumés (searched recursively)")
+    ap.add_argument("-o", "--out", type=Path, default=Path("ranked.csv"),
+                    help="ranked output, .csv or .jsonl")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 2,
+                    help="text-extraction processes")
+    ap.add_argument("--n-process", type=int, default=1, help="spaCy nlp.pipe processes")
+    ap.add_argument("--batch-size", type=int, default=32, help="spaCy nlp.pipe batch size")
+    ap.add_argument("--min-sim", type=float, default=THRESHOLD,
+                    help="skill similarity that counts as a match (1.0 = same skill or alias)")
+    args = ap.parse_args()
+
+    rows = screen(args.jd, args.folder, args.out, workers=args.workers,
+                  n_process=args.n_process, batch_size=args.batch_size, min_sim=args.min_sim)
+    write_results(rows, args.out)
+    print(f"wrote {len(rows)} ranked candidates → {args.out}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+PDF text-extraction benchmark: pages/second.
+
+Compares the old whole-file `pdfminer.high_level.extract_text` call with
+doc_text's page iterator, the page-parallel pool, an early stop after a
+character budget, and a warm disk-cache hit.  A synthetic text PDF is
+generated unless one is given.
+
+    python benchmarks/pdf_bench.py                   # 60-page synthetic PDF
+    python benchmarks/pdf_bench.py big.pdf --workers 8
+"""
+from __future__ import annotations
+
+import argparse, io, os, sys, tempfile, time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+LINE = ("Senior engineer: Python, PostgreSQL, Kubernetes, Terraform and AWS; "
+        "led migrations, on-call and mentoring.")
+
+
+def make_pdf(n_pages: int, lines: int = 45) -> bytes:
+    """Minimal multi-page Helvetica PDF, no third-party writer needed."""
+    objs = [b"<< /Type /Catalog /Pages 2 0 R >>", None,
+            b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for p in range(n_pages):
+        text = "".join(f"({p + 1}.{i} {LINE}) Tj T* " for i in range(lines))
+        stream = f"BT /F1 9 Tf 11 TL 36 800 Td {text} ET".encode()
+        objs.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        objs.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                    b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % len(objs))
+        kids.append(len(objs))
+    objs[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        " ".join(f"{k} 0 R" for k in kids).encode(), n_pages)
+
+    out, offsets = io.BytesIO(), []
+    out.write(b"%PDF-1.4\n")
+    for i, body in enumerate(objs, 1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n%s\nendobj\n" % (i, body))
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objs) + 1))
+    out.write(b"".join(b"%010d 00000 n \n" % o for o in offsets))
+    out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n"
+              % (len(objs) + 1, xref))
+    return out.getvalue()
+
+
+def measure(name: str, fn, pages: int) -> float:
+    t0 = time.perf_counter()
+    fn()
+    dt = time.perf_counter() - t0
+    print(f"{name:32s} {pages / dt:8.1f} pages/s  {dt:7.3f}s")
+    return pages / dt
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("pdf", nargs="?", type=Path, help="PDF to extract (default: synthetic)")
+    ap.add_argument("--pages", type=int, default=60, help="synthetic PDF length")
+    ap.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1))
+    ap.add_argument("--max-chars", type=int, default=20_000, help="early-stop budget")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["TEXT_CACHE_DIR"] = tmp          # before doc_text reads it
+        os.environ["PDF_WORKERS"] = str(args.workers)
+        import pdfminer.high_level as pdf
+        import doc_text
+
+        data = args.pdf.read_bytes() if args.pdf else make_pdf(args.pages)
+        n = doc_text.pdf_page_count(data)
+        print(f"{n} pages, {len(data) / 2**20:.1f} MB, {args.workers} workers\n")
+
+        doc_text._get_pool().submit(int).result()   # pool start-up is not per-file cost
+        base = measure("whole file (old)", lambda: pdf.extract_text(io.BytesIO(data)), n)
+        rows = [
+            ("page iterator", measure("page iterator, 1 process",
+                lambda: doc_text.pdf_pages(data, workers=1, cache=False), n)),
+            ("page-parallel", measure(f"page-parallel, {args.workers} workers",
+                lambda: doc_text.pdf_pages(data, cache=False), n)),
+        ]
+        kept = len(doc_text.pdf_pages(data, max_chars=args.max_chars, workers=1, cache=False))
+        rows.append(("early stop", measure(f"early stop @ {args.max_chars} chars",
+            lambda: doc_text.pdf_pages(data, max_chars=args.max_chars, workers=1,
+                                       cache=False), n)))
+        doc_text.pdf_pages(data)                    # fill the cache
+        rows.append(("cache hit", measure("disk cache hit",
+            lambda: doc_text.pdf_pages(data), n)))
+
+    print(f"\n(early stop read {kept}/{n} pages)")
+    print("speed-up vs whole file: " + ", ".join(f"{k} ×{v / base:.1f}" for k, v in rows))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Skill-extraction micro-benchmark on the fixture corpus.
+
+Compares the full en_core_web_sm pipeline (one nlp() call per document,
+as app.py used to) with the pruned pipeline, batched nlp.pipe, the
+tokenizer-only mode, and re-scoring from a saved DocBin.  Reports
+documents/second and peak Python memory per variant.
+
+    python benchmarks/skill_bench.py                 # 400 docs
+    python benchmarks/skill_bench.py -n 2000 --batch-size 64 --n-process 2
+"""
+from __future__ import annotations
+
+import argparse, gc, itertools, sys, tempfile, time, tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from skill_extract import SkillExtractor, load_nlp  # noqa: E402
+
+CORPUS = Path(__file__).resolve().parent / "fixtures" / "corpus"
+
+
+def corpus(n: int) -> list[str]:
+    texts = [p.read_text(encoding="utf-8") for p in sorted(CORPUS.glob("*.txt"))]
+    return list(itertools.islice(itertools.cycle(texts), n))
+
+
+def measure(name: str, fn, n_docs: int) -> dict:
+    gc.collect()
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    result = fn()
+    dt = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    row = {"variant": name, "docs_per_s": n_docs / dt, "seconds": dt,
+           "peak_mb": peak / 2**20, "skills": sum(len(s) for s in result)}
+    print(f"{name:28s} {row['docs_per_s']:9.1f} docs/s  {dt:7.2f}s  "
+          f"peak {row['peak_mb']:7.1f} MB  ({row['skills']} skills)")
+    return row
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("-n", type=int, default=400, help="documents (fixtures repeated)")
+    ap.add_argument("--batch-size", type=int, default=32)
+    ap.add_argument("--n-process", type=int, default=1)
+    args = ap.parse_args()
+    texts = corpus(args.n)
+    kw = dict(batch_size=args.batch_size, n_process=args.n_process)
+
+    full   = SkillExtractor(load_nlp(pruned=False))
+    pruned = SkillExtractor()
+    tokens = SkillExtractor(pruned.nlp, noun_chunks=False)
+    print(f"{len(texts)} docs · full pipes: {full.nlp.pipe_names} · "
+          f"pruned: {pruned.nlp.pipe_names}\n")
+
+    rows = [
+        measure("full, nlp() per doc", lambda: [full(t) for t in texts], len(texts)),
+        measure("full, nlp.pipe", lambda: list(full.pipe(texts, **kw)), len(texts)),
+        measure("pruned, nlp.pipe", lambda: list(pruned.pipe(texts, **kw)), len(texts)),
+        measure("tokenizer only", lambda: list(tokens.pipe(texts, **kw)), len(texts)),
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "corpus.spacy"
+        SkillExtractor.save_docs(pruned.parse(texts, **kw), path)
+        print(f"\nDocBin: {path.stat().st_size / 2**20:.1f} MB for {len(texts)} docs")
+        rows.append(measure("pruned, from DocBin",
+                            lambda: list(pruned.skills_from_docbin(path)), len(texts)))
+
+    base = rows[0]["docs_per_s"]
+    print("\nspeed-up vs full per-doc: " +
+          ", ".join(f"{r['variant']} ×{r['docs_per_s'] / base:.1f}" for r in rows[1:]))
+
+
+if __name__ == "__main__":
+    main()
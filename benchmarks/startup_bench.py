@@ -0,0 +1,90 @@
+"""
+Cold-start benchmark: how long does a fresh interpreter take to import
+each app module?  Every run is appended to startup_history.jsonl and
+compared with the previous one, so an import that starts loading a model
+again shows up as a regression.
+
+    python benchmarks/startup_bench.py            # 5 runs per module
+    python benchmarks/startup_bench.py -n 10 --fail-over 25
+"""
+from __future__ import annotations
+
+import argparse, json, os, statistics, subprocess, sys, time
+from pathlib import Path
+
+ROOT    = Path(__file__).resolve().parent.parent
+HISTORY = Path(__file__).resolve().parent / "startup_history.jsonl"
+MODULES = ["llm_utils", "interview_llm", "agent_avatar", "app"]
+
+
+def time_import(module: str) -> float:
+    env = {**os.environ, "OPENAI_API_KEY": os.getenv("OPENAI_API_KEY", "bench"),
+           "WARM_VOICE_MODELS": "0"}
+    t0 = time.perf_counter()
+    subprocess.run([sys.executable, "-c", f"import {module}"], cwd=ROOT, env=env,
+                   check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - t0
+
+
+def top_imports(module: str, k: int = 8) -> list[tuple[str, float]]:
+    """Slowest cumulative imports according to `python -X importtime`."""
+    env = {**os.environ, "OPENAI_API_KEY": os.getenv("OPENAI_API_KEY", "bench")}
+    err = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                         cwd=ROOT, env=env, capture_output=True, text=True).stderr
+    rows = []
+    for line in err.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cum, name = line[len("import time:"):].split("|")
+        if name[1:].startswith(" "):
+            continue                                  # nested import, counted by its parent
+        rows.append((name.strip(), int(cum) / 1e6))
+    return sorted(rows, key=lambda r: -r[1])[:k]
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("-n", type=int, default=5, help="runs per module")
+    ap.add_argument("--fail-over", type=float, default=None,
+                    help="exit 1 if any module is this %% slower than last run")
+    ap.add_argument("--breakdown", action="store_true", help="print slowest imports")
+    args = ap.parse_args()
+
+    result = {"ts": time.strftime("%Y-%m-%dT%H:%M:%S"), "python": sys.version.split()[0],
+              "median_s": {}}
+    for mod in MODULES:
+        try:
+            runs = [time_import(mod) for _ in range(args.n)]
+        except subprocess.CalledProcessError:
+            print(f"{mod:15s}  import failed (missing dependency?)")
+            continue
+        result["median_s"][mod] = round(statistics.median(runs), 3)
+        print(f"{mod:15s}  median {statistics.median(runs):6.2f}s  "
+              f"min {min(runs):6.2f}s  max {max(runs):6.2f}s")
+        if args.breakdown:
+            for name, s in top_imports(mod):
+                print(f"    {name:25s} {s:6.2f}s")
+
+    prev = None
+    if HISTORY.exists():
+        lines = HISTORY.read_text().splitlines()
+        prev = json.loads(lines[-1]) if lines else None
+    with HISTORY.open("a") as f:
+        f.write(json.dumps(result) + "\n")
+
+    if prev is None:
+        return
+    regressed = False
+    for mod, now in result["median_s"].items():
+        before = prev["median_s"].get(mod)
+        if not before:
+            continue
+        delta = 100 * (now - before) / before
+        print(f"{mod:15s}  {before:6.2f}s → {now:6.2f}s  ({delta:+.0f}%)")
+        if args.fail_over is not None and delta > args.fail_over:
+            regressed = True
+    sys.exit(1 if regressed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,7 +6,7 @@ Run inside the repo venv:
 import os, sys, subprocess, tempfile, shutil
 from pathlib import Path
 
-from elevenlabs import generate, save, Voice, VoiceSettings
+from tts_backends import ElevenLabsTTS
 
 # paths
 ROOT   = Path(__file__).parent
@@ -38,16 +38,11 @@ if not api_key:
 script = text_path.read_text().strip()
 print(f" Text ({len(script)} chars):", script[:80] + "…")
 
-audio = generate(
-    api_key = api_key,
-    text    = script,
-    model   = "eleven_multilingual_v2",
-    voice   = Voice(
-        voice_id = "TxGEqnHWrfWFTfGW9XjX",          #voice ID, change this as needed if you need another type of voice
-        settings = VoiceSettings(stability=0.38, similarity_boost=0.90)
-    )
+tts = ElevenLabsTTS(
+    voice_id = "TxGEqnHWrfWFTfGW9XjX",              #voice ID, change this as needed if you need another type of voice
+    settings = dict(stability=0.38, similarity_boost=0.90),
 )
-save(audio, wav_path)
+tts.to_wav(script, wav_path)                        # real 16-bit PCM WAV
 print("✔ Saved TTS  →", wav_path)
 
 #SadTalker inference
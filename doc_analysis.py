@@ -0,0 +1,124 @@
+# ───────────────────────── doc_analysis.py ─────────────────────────
+# Everything the app derives from one uploaded document, computed once
+# per content hash and kept on disk:
+#
+#   upload bytes ──sha256──▶ .cache/analysis/<sha>-<kind>-<version>.json
+#                            text · skills · top-5 · bullets · summary
+#
+# Streamlit reruns (every interview turn) and new sessions read the
+# artifact instead of re-parsing with spaCy or calling the LLM; a worker
+# restart only costs a JSON read.  `version` folds in whatever changes the
+# result (taxonomy file, page/char limits, ANALYSIS_VERSION), so stale
+# artifacts are simply never looked up again – and, like the text cache,
+# aged out / LRU-evicted by doc_text.prune_cache_dir (DOC_CACHE=0: off).
+# ─────────────────────────────────────────────────────────────────────
+from __future__ import annotations
+
+import hashlib, json, os, threading
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Literal, Sequence
+
+from doc_text import DOC_CACHE, extract_text_bytes, prune_cache_dir
+from llm_utils import analyse_texts
+from skill_extract import extract_bullets, extract_skills
+
+ROOT             = Path(__file__).resolve().parent
+ANALYSIS_DIR     = Path(os.getenv("ANALYSIS_CACHE_DIR", ROOT / ".cache" / "analysis"))
+ANALYSIS_VERSION = 1                    # bump when prompts / extraction change
+
+Kind = Literal["resume", "jd"]
+_LLM_KIND = {"resume": "résumé", "jd": "job description"}
+
+
+@dataclass(frozen=True)
+class DocAnalysis:
+    sha: str
+    kind: Kind
+    text: str
+    skills: list[str]                   # spaCy + taxonomy, sorted
+    top_skills: list[str]               # LLM top-5 of `skills`
+    bullets: list[str]
+    summary: str
+
+
+def _version(matcher, limits: dict) -> str:
+    blob = json.dumps([ANALYSIS_VERSION, getattr(matcher, "source_sha", ""), limits],
+                      sort_keys=True)
+    return hashlib.sha256(blob.encode()).hexdigest()[:12]
+
+
+class AnalysisStore:
+    """One JSON file per artifact; atomic writes, safe across workers."""
+
+    def __init__(self, root: Path = ANALYSIS_DIR, *, enabled: bool = DOC_CACHE):
+        self.root, self.enabled = Path(root), enabled
+
+    def _path(self, sha: str, kind: str, version: str) -> Path:
+        return self.root / sha[:2] / f"{sha}-{kind}-{version}.json"
+
+    def get(self, sha: str, kind: str, version: str) -> DocAnalysis | None:
+        if not self.enabled:
+            return None
+        path = self._path(sha, kind, version)
+        try:
+            hit = DocAnalysis(**json.loads(path.read_text(encoding="utf-8")))
+            os.utime(path)                      # LRU stamp for prune_cache_dir
+            return hit
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def put(self, a: DocAnalysis, version: str):
+        if not self.enabled:
+            return
+        path = self._path(a.sha, a.kind, version)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_text(json.dumps(asdict(a), ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, path)
+        prune_cache_dir(self.root)
+
+
+_store: AnalysisStore | None = None
+
+def get_analysis_store() -> AnalysisStore:
+    global _store
+    if _store is None:
+        _store = AnalysisStore()
+    return _store
+
+
+def analyse_uploads(
+    uploads: Sequence[tuple[bytes, str, Kind]],
+    nlp,
+    matcher,
+    *,
+    max_pages: int | None = None,
+    max_chars: int | None = None,
+    store: AnalysisStore | None = None,
+) -> list[DocAnalysis]:
+    """
+    [(bytes, suffix, kind), …] → one DocAnalysis each, in order.  Cached
+    documents cost a file read; the rest are parsed locally and then share
+    one concurrent LLM round (summary + ranking per document).
+    """
+    store = store or get_analysis_store()
+    version = _version(matcher, {"max_pages": max_pages, "max_chars": max_chars})
+    shas = [hashlib.sha256(data).hexdigest() for data, _, _ in uploads]
+    out: list[DocAnalysis | None] = [store.get(sha, kind, version)
+                                     for sha, (_, _, kind) in zip(shas, uploads)]
+
+    todo = []
+    for i, ((data, suffix, kind), hit) in enumerate(zip(uploads, out)):
+        if hit is None:
+            text = extract_text_bytes(data, suffix, max_pages=max_pages, max_chars=max_chars)
+            todo.append((i, kind, text, extract_skills(text, nlp, matcher)))
+    if not todo:
+        return out
+
+    llm = analyse_texts([(text, _LLM_KIND[kind], skills) for _, kind, text, skills in todo])
+    for (i, kind, text, skills), (summary, top) in zip(todo, llm):
+        out[i] = DocAnalysis(shas[i], kind, text, sorted(skills, key=str.lower), top,
+                             extract_bullets(text), summary)
+        store.put(out[i], version)
+    return out
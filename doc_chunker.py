@@ -0,0 +1,94 @@
+# ── doc_chunker.py ───────────────────────────────────────────────────────
+# Local token counting + section-aware chunking for long résumés / JDs.
+#
+#   split_sections()  → heading-delimited sections, in document order
+#   chunk_document()  → sections packed into ≤ `chunk_tokens` pieces,
+#                       stopping at the per-document `budget`
+# ─────────────────────────────────────────────────────────────────────────
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+
+try:                                       # optional: exact OpenAI token counts
+    import tiktoken
+except ImportError:                        # fall back to the ~4 chars/token rule
+    tiktoken = None
+
+
+@lru_cache(maxsize=8)
+def _encoding(model: str):
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+
+def count_tokens(text: str, model: str = "gpt-3.5-turbo") -> int:
+    if tiktoken is None:
+        return (len(text) + 3) // 4
+    return len(_encoding(model).encode(text, disallowed_special=()))
+
+
+# a heading: "EXPERIENCE", "Work History:", "## Benefits", "3. Requirements"
+_HEADING = re.compile(
+    r"^[ \t]*(?:#{1,6}[ \t]+.+"
+    r"|(?:\d+[.)][ \t]+)?[A-Z][A-Z0-9 &/,()\-]{2,60}:?"
+    r"|[A-Z][A-Za-z0-9 &/()\-]{2,50}:)[ \t]*$", re.M)
+
+
+def split_sections(text: str) -> list[str]:
+    """Split at heading lines; each section keeps its heading."""
+    starts = [m.start() for m in _HEADING.finditer(text)]
+    if not starts or starts[0] != 0:
+        starts.insert(0, 0)
+    bounds = starts + [len(text)]
+    return [text[a:b].strip() for a, b in zip(bounds, bounds[1:]) if text[a:b].strip()]
+
+
+def _split_oversize(section: str, chunk_tokens: int, model: str) -> list[str]:
+    """A section bigger than one chunk: cut on paragraphs, then on lines."""
+    parts = re.split(r"\n\s*\n", section)
+    if len(parts) == 1:
+        parts = section.splitlines()
+    out, cur, cur_t = [], [], 0
+    for p in parts:
+        t = count_tokens(p, model)
+        if t > chunk_tokens:                         # one giant line: hard cut
+            step = max(1, len(p) * chunk_tokens // t)
+            pieces = [p[i:i + step] for i in range(0, len(p), step)]
+        else:
+            pieces = [p]
+        for piece in pieces:
+            pt = count_tokens(piece, model) if piece is not p else t
+            if cur and cur_t + pt > chunk_tokens:
+                out.append("\n".join(cur)); cur, cur_t = [], 0
+            cur.append(piece); cur_t += pt
+    if cur:
+        out.append("\n".join(cur))
+    return out
+
+
+def chunk_document(text: str, *, chunk_tokens: int = 1200, budget: int = 12_000,
+                   model: str = "gpt-3.5-turbo") -> list[str]:
+    """
+    Pack sections into chunks of ≤ `chunk_tokens`.  Sections are taken in
+    order until `budget` tokens are used, so trailing appendices of a very
+    long document (benefits, legal boilerplate) are what gets dropped.
+    """
+    chunks, cur, cur_t, used = [], [], 0, 0
+    for sec in split_sections(text):
+        t = count_tokens(sec, model)
+        pieces = [(sec, t)] if t <= chunk_tokens else \
+                 [(p, count_tokens(p, model)) for p in _split_oversize(sec, chunk_tokens, model)]
+        for piece, pt in pieces:
+            if used + pt > budget:
+                if cur:
+                    chunks.append("\n\n".join(cur))
+                return chunks
+            if cur and cur_t + pt > chunk_tokens:
+                chunks.append("\n\n".join(cur)); cur, cur_t = [], 0
+            cur.append(piece); cur_t += pt; used += pt
+    if cur:
+        chunks.append("\n\n".join(cur))
+    return chunks
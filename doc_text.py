@@ -0,0 +1,197 @@
+# ───────────────────────── doc_text.py ─────────────────────────
+# Plain-text extraction for PDF / TXT / DOCX, usable without Streamlit
+# (app.py wraps it in st.cache_data; batch_screen.py runs it in a pool).
+#
+# PDFs are read page by page: extraction can stop after `max_pages` or
+# once `max_chars` of text is in hand, large files are split into page
+# ranges parsed in a process pool, and the pages are cached on disk by
+# sha256 of the bytes (same file under another name → no re-parse).
+# The cache holds résumé text, so it is bounded (DOC_CACHE_MAX_MB,
+# DOC_CACHE_TTL_DAYS; doc_analysis shares the limits) and DOC_CACHE=0
+# turns it off.
+from __future__ import annotations
+
+import hashlib, io, json, multiprocessing as mp, os, threading, time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from pdfminer.converter import TextConverter
+from pdfminer.layout import LAParams
+from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+from pdfminer.pdfpage import PDFPage
+import docx
+
+SUPPORTED = (".pdf", ".txt", ".docx")
+
+ROOT          = Path(__file__).resolve().parent
+TEXT_CACHE    = Path(os.getenv("TEXT_CACHE_DIR", ROOT / ".cache" / "text"))
+PARALLEL_MIN  = 8                       # pages before a PDF is split across processes
+PDF_WORKERS   = int(os.getenv("PDF_WORKERS", min(4, os.cpu_count() or 1)))
+DOC_CACHE     = os.getenv("DOC_CACHE", "1") == "1"                    # text + analysis
+DOC_CACHE_MAX_BYTES = int(os.getenv("DOC_CACHE_MAX_MB", "256")) * 1024 * 1024  # per directory
+DOC_CACHE_TTL_S     = float(os.getenv("DOC_CACHE_TTL_DAYS", "30")) * 86_400
+
+
+# ─── PDF pages ──────────────────────────────────────────────────
+def pdf_page_count(data: bytes) -> int:
+    return sum(1 for _ in PDFPage.get_pages(io.BytesIO(data)))
+
+
+def iter_pdf_pages(data: bytes, pages: range | None = None):
+    """Yield the text of each page (form feed stripped), in order."""
+    rsrc, buf = PDFResourceManager(caching=True), io.StringIO()
+    device = TextConverter(rsrc, buf, laparams=LAParams())
+    interp = PDFPageInterpreter(rsrc, device)
+    try:
+        for page in PDFPage.get_pages(io.BytesIO(data), pages):
+            interp.process_page(page)
+            yield buf.getvalue().rstrip("\f")
+            buf.seek(0); buf.truncate()
+    finally:
+        device.close()
+
+
+def _page_range(args: tuple[bytes, int, int]) -> list[str]:
+    """Pool worker: texts of pages [start, stop)."""
+    data, start, stop = args
+    return list(iter_pdf_pages(data, range(start, stop)))
+
+
+def _pool_ok() -> bool:
+    return not mp.current_process().daemon     # e.g. inside batch_screen's Pool
+
+
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+def _get_pool() -> ProcessPoolExecutor:
+    """Long-lived page workers (spawning per upload would cost more than it saves)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(PDF_WORKERS, mp_context=mp.get_context("spawn"))
+        return _pool
+
+
+def _extract_pdf(data: bytes, max_pages: int | None, max_chars: int | None,
+                 workers: int) -> tuple[list[str], bool]:
+    """(pages, complete) – complete means every page of the file was read."""
+    total = pdf_page_count(data)
+    n = min(total, max_pages) if max_pages else total
+    pages, chars = [], 0
+
+    def budget_hit(texts) -> bool:
+        nonlocal chars
+        for t in texts:
+            pages.append(t); chars += len(t)
+            if max_chars and chars >= max_chars:
+                return True
+        return False
+
+    if workers > 1 and n >= PARALLEL_MIN and _pool_ok():
+        step = max(2, -(-n // (workers * 2)))           # ~2 ranges per worker
+        jobs = [(data, a, min(a + step, n)) for a in range(0, n, step)]
+        futs = [_get_pool().submit(_page_range, j) for j in jobs]
+        for fut in futs:                                # in page order
+            if budget_hit(fut.result()):
+                for f in futs: f.cancel()
+                break
+    else:
+        budget_hit(iter_pdf_pages(data, range(n)))
+    return pages, len(pages) == total
+
+
+# ─── disk cache ─────────────────────────────────────────────────
+PRUNE_EVERY = 32                        # puts between prune_cache_dir scans
+_puts: dict[Path, int] = {}
+_puts_lock = threading.Lock()
+
+def prune_cache_dir(root: Path, *, max_bytes: int = DOC_CACHE_MAX_BYTES,
+                    ttl_s: float = DOC_CACHE_TTL_S, force: bool = False):
+    """Drop artifacts older than `ttl_s`, then least-recently-used ones until
+    `root` fits `max_bytes` (a hit refreshes the file's mtime).  Runs on the
+    first and then every PRUNE_EVERY-th call per directory unless `force`."""
+    with _puts_lock:
+        n = _puts[root] = _puts.get(root, 0) + 1
+    if not force and (n - 1) % PRUNE_EVERY:
+        return
+    files, now = [], time.time()
+    for path in Path(root).glob("*/*.json"):
+        try:
+            st = path.stat()
+        except OSError:                     # removed by another worker
+            continue
+        if now - st.st_mtime > ttl_s:
+            path.unlink(missing_ok=True)
+        else:
+            files.append((st.st_mtime, st.st_size, path))
+    total = sum(size for _, size, _ in files)
+    for _, size, path in sorted(files):
+        if total <= max_bytes:
+            break
+        path.unlink(missing_ok=True)
+        total -= size
+
+
+def _cache_path(sha: str) -> Path:
+    return TEXT_CACHE / sha[:2] / f"{sha}.json"
+
+
+def _cached_pages(sha: str, max_pages: int | None, max_chars: int | None) -> list[str] | None:
+    path = _cache_path(sha)
+    try:
+        hit = json.loads(path.read_text(encoding="utf-8"))
+        os.utime(path)                                   # LRU stamp
+    except (OSError, ValueError):
+        return None
+    pages = hit["pages"]
+    if hit["complete"] or (max_pages and len(pages) >= max_pages) \
+       or (max_chars and sum(map(len, pages)) >= max_chars):
+        return pages
+    return None                                          # cached prefix too short
+
+
+def _store_pages(sha: str, pages: list[str], complete: bool):
+    path = _cache_path(sha)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_text(json.dumps({"pages": pages, "complete": complete}, ensure_ascii=False),
+                   encoding="utf-8")
+    os.replace(tmp, path)
+    prune_cache_dir(TEXT_CACHE)
+
+
+def pdf_pages(data: bytes, *, max_pages: int | None = None, max_chars: int | None = None,
+              workers: int = PDF_WORKERS, cache: bool = DOC_CACHE) -> list[str]:
+    """Page texts of a PDF, cut at `max_pages` / once `max_chars` is reached."""
+    sha = hashlib.sha256(data).hexdigest()
+    pages = _cached_pages(sha, max_pages, max_chars) if cache else None
+    if pages is None:
+        pages, complete = _extract_pdf(data, max_pages, max_chars, workers)
+        if cache:
+            _store_pages(sha, pages, complete)
+    if max_pages:
+        pages = pages[:max_pages]
+    if max_chars:
+        out, chars = [], 0
+        for p in pages:
+            out.append(p); chars += len(p)
+            if chars >= max_chars: break
+        pages = out
+    return pages
+
+
+# ─── any document ───────────────────────────────────────────────
+def extract_text_bytes(data: bytes, suffix: str, *, max_pages: int | None = None,
+                       max_chars: int | None = None) -> str:
+    suf = suffix.lower()
+    if suf == ".txt":  return data.decode("utf-8", errors="ignore")
+    if suf == ".pdf":  return "\f".join(pdf_pages(data, max_pages=max_pages, max_chars=max_chars))
+    if suf == ".docx":
+        doc = docx.Document(io.BytesIO(data)); return "\n".join(p.text for p in doc.paragraphs)
+    return ""
+
+
+def extract_text_path(path, **limits) -> str:
+    path = Path(path)
+    return extract_text_bytes(path.read_bytes(), path.suffix, **limits)
@@ -1,17 +1,7 @@
-from elevenlabs import generate, save, Voice, VoiceSettings
-import os
+from tts_backends import ElevenLabsTTS
 
 
-os.environ["ELEVEN_API_KEY"] = "..."
-
 def generate_audio(text: str, output_path="sample.wav"):
-    audio = generate(
-        text=text,
-        voice=Voice(
-            voice_id="UgBBYS2sOqTuMpoF3BR0",  
-            settings=VoiceSettings(stability=0.5, similarity_boost=0.75)
-        ),
-        model="eleven_multilingual_v2"
-    )
-    save(audio, output_path)
+    """ELEVEN_API_KEY must be set in the environment."""
+    ElevenLabsTTS().to_wav(text, output_path)
     print(f"[✓] Saved audio to {output_path}")
@@ -1,24 +1,16 @@
 # ── interview_llm.py ──────────────────────────────────────────────
 from __future__ import annotations
-from typing import List, Dict
+from dataclasses import dataclass
+from typing import List, Dict, Iterator, Literal, Optional
 import textwrap
 
-from llm_utils import _gpt_chat, ChatMessage
+from llm_utils import _gpt_chat, _gpt_chat_stream, ChatMessage
+from interview_memory import InterviewMemory
+from sentence_stream import SentenceChunker, split_sentences
 
 
-def next_interview_question(
-    resume_summary: str,
-    jd_summary: str,
-    history: List[Dict[str, str]],
-    *,
-    model: str = "gpt-3.5-turbo",
-) -> str:
-    """One short acknowledgement + one follow-up question (≤ 60 words total)."""
-    dialogue = "\n".join(
-        f"• Q: {h['q']}\n  A: {h['a'] or '(no answer)'}" for h in history
-    ) or "(none yet)"
-
-    prompt = textwrap.dedent(f"""
+def _question_prompt(resume_summary: str, jd_summary: str, dialogue: str) -> str:
+    return textwrap.dedent(f"""
         You are an AI hiring manager running a structured technical interview.
 
         RULES
@@ -38,4 +30,108 @@ def next_interview_question(
         {dialogue}
     """).strip()
 
-    return _gpt_chat([ChatMessage(role="user", content=prompt)], model=model)
\ No newline at end of file
+
+def _dialogue(history: List[Dict[str, str]] | None,
+              memory: Optional[InterviewMemory]) -> str:
+    if memory is not None:
+        return memory.context()
+    return "\n".join(
+        f"• Q: {h['q']}\n  A: {h['a'] or '(no answer)'}" for h in history or []
+    ) or "(none yet)"
+
+
+def next_interview_question(
+    resume_summary: str,
+    jd_summary: str,
+    history: List[Dict[str, str]] | None = None,
+    *,
+    memory: Optional[InterviewMemory] = None,
+    model: str = "gpt-3.5-turbo",
+) -> str:
+    """
+    One short acknowledgement + one follow-up question (≤ 60 words total).
+
+    With `memory` the prompt carries a running summary plus the last few
+    turns (constant size), and a reply repeating an earlier question is
+    regenerated once.  Without it, the full `history` is sent as before.
+    """
+    prompt = _question_prompt(resume_summary, jd_summary, _dialogue(history, memory))
+    if memory is None:
+        return _gpt_chat([ChatMessage(role="user", content=prompt)], model=model)
+
+    reply = _gpt_chat([ChatMessage(role="user", content=prompt)], model=model)
+    if memory.was_asked(reply):
+        reply = _gpt_chat([
+            ChatMessage(role="user", content=prompt),
+            ChatMessage(role="assistant", content=reply),
+            ChatMessage(role="user", content="That question was already asked. "
+                        "Ask a different follow-up, same rules."),
+        ], model=model)
+    memory.add_question(reply)
+    return reply
+
+
+@dataclass
+class QuestionChunk:
+    kind: Literal["token", "sentence"]
+    text: str
+
+
+def stream_interview_question(
+    resume_summary: str,
+    jd_summary: str,
+    history: List[Dict[str, str]] | None = None,
+    *,
+    memory: Optional[InterviewMemory] = None,
+    model: str = "gpt-3.5-turbo",
+    min_chars: int = 12,
+) -> Iterator[QuestionChunk]:
+    """
+    Streaming `next_interview_question`: yields every token as it arrives
+    and a "sentence" chunk the moment a sentence closes, so the
+    acknowledgement can go to TTS while the follow-up is still being written.
+
+    With `memory`, sentences from the first question on are held until the
+    reply is complete; if it repeats an earlier question, just the question
+    is regenerated (once) and its sentences replace the held ones.  "token"
+    chunks are the first draft as it arrives.
+    """
+    prompt = _question_prompt(resume_summary, jd_summary, _dialogue(history, memory))
+    chunker = SentenceChunker(min_chars=min_chars, clause_chars=10**9)
+    parts, spoken, held = [], [], []        # draft tokens, sentences sent, held back
+
+    def closed(sentence: str) -> Iterator[QuestionChunk]:
+        if memory is not None and (held or "?" in sentence):
+            held.append(sentence)
+        else:
+            spoken.append(sentence)
+            yield QuestionChunk("sentence", sentence)
+
+    for delta in _gpt_chat_stream([ChatMessage(role="user", content=prompt)], model=model):
+        parts.append(delta)
+        yield QuestionChunk("token", delta)
+        for sentence in chunker.feed(delta):
+            yield from closed(sentence)
+    if (rest := chunker.flush()):
+        yield from closed(rest)
+
+    if memory is None:
+        return
+    reply = " ".join(spoken + held)
+    if held and memory.was_asked(reply):
+        question = _gpt_chat([
+            ChatMessage(role="user", content=prompt),
+            ChatMessage(role="assistant", content="".join(parts)),
+            ChatMessage(role="user", content="That question was already asked. Reply with "
+                        "only a different follow-up question, one sentence."),
+        ], model=model)
+        held = split_sentences(question, min_chars=min_chars, clause_chars=10**9)
+        reply = " ".join(spoken + held)
+    for sentence in held:
+        yield QuestionChunk("sentence", sentence)
+    memory.add_question(reply)
+
+
+def stream_question_sentences(*args, **kw) -> Iterator[str]:
+    """Just the complete sentences of `stream_interview_question`."""
+    return (c.text for c in stream_interview_question(*args, **kw) if c.kind == "sentence")
@@ -0,0 +1,112 @@
+# ── interview_memory.py ──────────────────────────────────────────
+# Constant-size dialogue context for next_interview_question.
+#
+#   prompt context = running summary of old turns
+#                  + the last K turns verbatim
+#                  (+ any turn whose fold into the summary is still running)
+#
+# Folding happens on a background thread after each answer, so the
+# interview turn never waits for it.  Asked questions are remembered as
+# hashes, which is enough to enforce "never repeat" without resending them.
+# ─────────────────────────────────────────────────────────────────
+from __future__ import annotations
+
+import hashlib, re, textwrap, threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+from llm_utils import _gpt_chat, ChatMessage
+
+_fold_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="memory-fold")
+
+
+def question_hash(question: str) -> str:
+    """Wording-insensitive fingerprint: lower-case content words, sorted."""
+    words = sorted(set(re.findall(r"[a-z0-9+#]+", question.lower())) - _FILLER)
+    return hashlib.sha1(" ".join(words).encode()).hexdigest()[:16]
+
+_FILLER = {"a", "an", "the", "you", "your", "can", "could", "would", "please",
+           "tell", "me", "about", "what", "how", "do", "did", "is", "are", "of",
+           "to", "in", "on", "for", "and", "with"}
+
+
+def last_question(reply: str) -> str:
+    """The question sentence of an 'acknowledgement + question' reply."""
+    qs = re.findall(r"[^.!?]*\?", reply)
+    return (qs[-1] if qs else reply).strip()
+
+
+class InterviewMemory:
+    """Per-interview state; keep one in st.session_state."""
+
+    def __init__(self, keep_last: int = 3, *, summary_words: int = 120,
+                 model: str = "gpt-3.5-turbo"):
+        self.keep_last = keep_last
+        self.summary_words = summary_words
+        self.model = model
+        self.turns: List[Dict[str, str]] = []   # full transcript (for the UI)
+        self.summary = ""
+        self.folded = 0                         # turns[:folded] are in `summary`
+        self.asked: set[str] = set()
+        self._lock = threading.Lock()           # guards summary / folded
+        self._fold_lock = threading.Lock()      # one fold at a time
+
+    # ── updates ───────────────────────────────────────────────────
+    def add_question(self, question: str):
+        self.asked.add(question_hash(last_question(question)))
+
+    def add_turn(self, q: str, a: str):
+        """Record an answered question; folds old turns in the background."""
+        self.turns.append({"q": q, "a": a})
+        self.add_question(q)
+        if len(self.turns) - self.folded > self.keep_last:
+            _fold_pool.submit(self._fold)
+
+    def drop_last_turn(self):
+        """Undo the last add_turn (e.g. the follow-up could not be queued)."""
+        with self._lock:
+            if len(self.turns) > self.folded:
+                self.turns.pop()
+
+    def was_asked(self, question: str) -> bool:
+        return question_hash(last_question(question)) in self.asked
+
+    # ── prompt context ────────────────────────────────────────────
+    def context(self) -> str:
+        with self._lock:
+            summary, recent = self.summary, self.turns[self.folded:]
+        dialogue = "\n".join(
+            f"• Q: {h['q']}\n  A: {h['a'] or '(no answer)'}" for h in recent
+        ) or "(none yet)"
+        if summary:
+            dialogue = f"Earlier (summary): {summary}\n\nMost recent:\n{dialogue}"
+        return dialogue
+
+    # ── background fold ───────────────────────────────────────────
+    def _fold(self):
+        with self._fold_lock:
+            with self._lock:
+                upto = len(self.turns) - self.keep_last
+                if upto <= self.folded:
+                    return
+                old, summary = self.turns[self.folded:upto], self.summary
+            block = "\n".join(f"Q: {h['q']}\nA: {h['a'] or '(no answer)'}" for h in old)
+            prompt = textwrap.dedent(f"""
+                Update the running summary of a job interview with the new
+                exchanges. Keep topics covered, claims the candidate made,
+                strengths and gaps. At most {self.summary_words} words, plain prose.
+
+                === Summary so far ===
+                {summary or "(empty)"}
+
+                === New exchanges ===
+            """).strip() + "\n" + block
+            try:
+                new = _gpt_chat([ChatMessage(role="user", content=prompt)],
+                                model=self.model, temperature=0,
+                                cache=False)    # candidate answers: private, never repeat
+            except Exception as e:              # keep the turns verbatim, retry next time
+                print(f"[interview_memory] fold failed: {e}")
+                return
+            with self._lock:
+                self.summary, self.folded = new, upto
@@ -0,0 +1,203 @@
+# ───────────────────────── job_scheduler.py ─────────────────────────
+# Shared background jobs (TTS + avatar renders) for every Streamlit session.
+#
+#   submit(session, fn) ──▶ per-session FIFO ──round robin──▶ N worker threads
+#                      └──▶ SchedulerBusy when the session / box is full
+#
+# • bounded:   at most `workers` jobs run at once on the whole machine
+# • fair:      sessions are served in rotation, one running job per session
+#              (which also keeps a session's clips in order)
+# • backpressure: `max_per_session` / `max_pending` queued jobs, beyond
+#              that `submit` raises SchedulerBusy so the UI can say so
+#
+# A Job is a handle the UI polls: state, progress, partial outputs.
+# ─────────────────────────────────────────────────────────────────────
+from __future__ import annotations
+
+import itertools, os, threading, time
+from collections import OrderedDict, deque
+from typing import Any, Callable
+
+WORKERS          = int(os.getenv("SPEAK_WORKERS", "2"))
+MAX_PER_SESSION  = int(os.getenv("SPEAK_MAX_PER_SESSION", "2"))
+MAX_PENDING      = int(os.getenv("SPEAK_MAX_PENDING", "16"))
+
+
+class SchedulerBusy(RuntimeError):
+    """Queue limit reached; try again once earlier jobs finish."""
+
+
+class Job:
+    """Handle for one background job; every method is thread-safe."""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, session: str, fn: Callable, args: tuple, kw: dict):
+        self.id = next(self._ids)
+        self.session = session
+        self._fn, self._args, self._kw = fn, args, kw
+        self.state = "queued"           # queued → running → done | failed | cancelled
+        self.total = 0                  # expected outputs (may grow while running)
+        self.outputs: list[Any] = []    # partial results, in order
+        self.result: Any = None
+        self.error: BaseException | None = None
+        self.created = time.time()
+        self.started = self.finished = None
+        self._cancel = threading.Event()
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+
+    # ── called by the job function ──
+    def push(self, output: Any):
+        with self._lock:
+            self.outputs.append(output)
+
+    def expect(self, total: int):
+        with self._lock:
+            self.total = max(self.total, total)
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    # ── called by the UI ──
+    def cancel(self):
+        self._cancel.set()
+
+    def progress(self) -> tuple[int, int]:
+        with self._lock:
+            return len(self.outputs), max(self.total, len(self.outputs))
+
+    def snapshot(self) -> list[Any]:
+        with self._lock:
+            return list(self.outputs)
+
+    @property
+    def finished_ok(self) -> bool:
+        return self.state == "done"
+
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def wait(self, timeout: float | None = None) -> "Job":
+        self._done.wait(timeout)
+        return self
+
+    def __repr__(self):
+        done, total = self.progress()
+        return f"<Job {self.id} {self.session} {self.state} {done}/{total}>"
+
+
+class JobScheduler:
+    def __init__(self, workers: int = WORKERS, *, max_per_session: int = MAX_PER_SESSION,
+                 max_pending: int = MAX_PENDING):
+        self.max_per_session, self.max_pending = max_per_session, max_pending
+        self._queues: OrderedDict[str, deque[Job]] = OrderedDict()
+        self._running: dict[str, Job] = {}
+        self._cv = threading.Condition()
+        self._closed = False
+        self._threads = [threading.Thread(target=self._worker, name=f"job-{i}", daemon=True)
+                         for i in range(workers)]
+        for t in self._threads:
+            t.start()
+
+    # ── submit / inspect ──
+    def submit(self, session: str, fn: Callable[..., Any], *args, **kw) -> Job:
+        """Queue fn(job, *args, **kw) for `session`; raises SchedulerBusy when full."""
+        with self._cv:
+            if self._closed:
+                raise RuntimeError("scheduler is shut down")
+            queued = len(self._queues.get(session, ()))
+            if queued >= self.max_per_session:
+                raise SchedulerBusy(f"{queued} jobs already queued for this session")
+            if self.pending() >= self.max_pending:
+                raise SchedulerBusy("render queue is full")
+            job = Job(session, fn, args, kw)
+            self._queues.setdefault(session, deque()).append(job)
+            self._cv.notify()
+            return job
+
+    def pending(self, session: str | None = None) -> int:
+        """Queued (not yet running) jobs, for one session or all."""
+        with self._cv:
+            if session is not None:
+                return len(self._queues.get(session, ()))
+            return sum(len(q) for q in self._queues.values())
+
+    def position(self, job: Job) -> int:
+        """Jobs that will start before `job` (0 = next / running)."""
+        with self._cv:
+            if job.state != "queued":
+                return 0
+            q = self._queues.get(job.session, deque())
+            ahead = list(q).index(job) if job in q else 0
+            others = sum(min(len(oq), ahead + 1) for s, oq in self._queues.items()
+                         if s != job.session)
+            return ahead + others
+
+    def busy(self) -> bool:
+        return self.pending() >= self.max_pending
+
+    def accepts(self, session: str) -> bool:
+        """Whether `submit(session, …)` would succeed right now."""
+        with self._cv:
+            return (not self._closed and not self.busy() and
+                    len(self._queues.get(session, ())) < self.max_per_session)
+
+    def cancel_session(self, session: str):
+        """Drop the session's queued jobs and ask its running one to stop."""
+        with self._cv:
+            for job in self._queues.pop(session, ()):
+                job.state = "cancelled"; job.cancel(); job._done.set()
+            if (job := self._running.get(session)):
+                job.cancel()
+
+    def shutdown(self):
+        with self._cv:
+            self._closed = True
+            self._cv.notify_all()
+
+    # ── workers ──
+    def _next(self) -> Job | None:
+        """Round robin: first session (in rotation order) with work and nothing running."""
+        for session, q in self._queues.items():
+            if q and session not in self._running:
+                job = q.popleft()
+                self._queues.move_to_end(session)
+                if not q:
+                    del self._queues[session]
+                self._running[session] = job
+                return job
+        return None
+
+    def _worker(self):
+        while True:
+            with self._cv:
+                while not self._closed and (job := self._next()) is None:
+                    self._cv.wait()
+                if self._closed:
+                    return
+            job.state, job.started = "running", time.time()
+            try:
+                job.result = job._fn(job, *job._args, **job._kw)
+                job.state = "cancelled" if job.cancelled else "done"
+            except BaseException as e:          # surfaced to the UI via job.error
+                job.error, job.state = e, "failed"
+            finally:
+                job.finished = time.time()
+                job._done.set()
+                with self._cv:
+                    self._running.pop(job.session, None)
+                    self._cv.notify_all()
+
+
+_scheduler: JobScheduler | None = None
+_scheduler_lock = threading.Lock()
+
+def get_scheduler() -> JobScheduler:
+    """The process-wide scheduler shared by every Streamlit session."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = JobScheduler()
+        return _scheduler
@@ -0,0 +1,107 @@
+# ── llm_cache.py ─────────────────────────────────────────────────────────
+# Disk-backed chat-completion cache shared by every process on the box.
+#
+#   key  = sha256(model, temperature, messages)
+#   rows expire after `ttl_s`; beyond `max_bytes` the least recently used
+#   rows go first.  SQLite in WAL mode + busy timeout makes concurrent
+#   Streamlit workers safe (readers never block, writers queue briefly).
+# ─────────────────────────────────────────────────────────────────────────
+from __future__ import annotations
+
+import hashlib, json, os, sqlite3, threading, time
+from pathlib import Path
+
+ROOT       = Path(__file__).resolve().parent
+CACHE_PATH = Path(os.getenv("LLM_CACHE_PATH", ROOT / ".cache" / "llm.sqlite"))
+TTL_S      = float(os.getenv("LLM_CACHE_TTL_DAYS", "30")) * 86_400
+MAX_BYTES  = int(os.getenv("LLM_CACHE_MAX_MB", "256")) * 1024 * 1024
+ENABLED    = os.getenv("LLM_CACHE", "1") == "1"
+
+
+def cache_key(model: str, temperature: float, messages: list[dict]) -> str:
+    blob = json.dumps([model, temperature, messages], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """get/put of reply strings; cheap to construct, one connection per thread."""
+
+    EVICT_EVERY = 32                    # puts between size checks
+
+    def __init__(self, path: Path = CACHE_PATH, *, ttl_s: float = TTL_S,
+                 max_bytes: int = MAX_BYTES):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_s, self.max_bytes = ttl_s, max_bytes
+        self._local = threading.local()
+        self._puts = 0
+        self.hits = self.misses = 0     # this process only
+        self._db().execute("""
+            CREATE TABLE IF NOT EXISTS replies(
+                key TEXT PRIMARY KEY, model TEXT, reply TEXT, size INTEGER,
+                created REAL, last_access REAL)""")
+        self._db().execute(
+            "CREATE INDEX IF NOT EXISTS replies_lru ON replies(last_access)")
+
+    def _db(self) -> sqlite3.Connection:
+        con = getattr(self._local, "con", None)
+        if con is None:
+            con = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("PRAGMA synchronous=NORMAL")
+            self._local.con = con
+        return con
+
+    def get(self, key: str) -> str | None:
+        now = time.time()
+        row = self._db().execute(
+            "SELECT reply, created FROM replies WHERE key=?", (key,)).fetchone()
+        if row is None or now - row[1] > self.ttl_s:
+            self.misses += 1
+            return None
+        self._db().execute("UPDATE replies SET last_access=? WHERE key=?", (now, key))
+        self.hits += 1
+        return row[0]
+
+    def put(self, key: str, model: str, reply: str):
+        now = time.time()
+        self._db().execute(
+            "INSERT OR REPLACE INTO replies VALUES(?, ?, ?, ?, ?, ?)",
+            (key, model, reply, len(reply.encode("utf-8")) + len(key), now, now))
+        self._puts += 1
+        if self._puts % self.EVICT_EVERY == 0:
+            self.evict()
+
+    def evict(self):
+        """Drop expired rows, then LRU rows until under `max_bytes`."""
+        db = self._db()
+        db.execute("DELETE FROM replies WHERE created < ?", (time.time() - self.ttl_s,))
+        total = db.execute("SELECT COALESCE(SUM(size), 0) FROM replies").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        excess, cutoff = total - self.max_bytes, None
+        for last_access, size in db.execute(
+                "SELECT last_access, size FROM replies ORDER BY last_access"):
+            excess -= size
+            cutoff = last_access
+            if excess <= 0:
+                break
+        if cutoff is not None:
+            db.execute("DELETE FROM replies WHERE last_access <= ?", (cutoff,))
+
+    def clear(self):
+        self._db().execute("DELETE FROM replies")
+
+
+_cache: LLMCache | None = None
+_cache_lock = threading.Lock()
+
+def get_llm_cache() -> LLMCache | None:
+    """The process-wide cache, or None when disabled with LLM_CACHE=0."""
+    global _cache
+    if not ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = LLMCache()
+        return _cache
@@ -1,12 +1,22 @@
 # ── llm_utils.py ─────────────────────────────────────────────────────────
 
 from __future__ import annotations
-from typing import Literal, List
-import os
+from typing import Any, Awaitable, Iterator, Literal, List, Sequence
+import asyncio, os, threading
 
 import openai
 from pydantic import BaseModel
 
+from llm_cache import get_llm_cache, cache_key
+from doc_chunker import chunk_document, count_tokens
+
+# documents longer than this are condensed chunk-by-chunk (map) before the
+# real prompt runs on the notes (reduce); shorter ones are sent as-is
+MAP_TRIGGER_TOKENS = 3_000
+CHUNK_TOKENS       = 1_200
+DOC_TOKEN_BUDGET   = 12_000     # tokens of one document we are willing to read
+MAP_CONCURRENCY    = 8
+
 
 # ------------------------------------------------------------------ #
 # 1.  Tiny pydantic schema to keep messages tidy
@@ -17,35 +27,179 @@ class ChatMessage(BaseModel):
 
 
 # ------------------------------------------------------------------ #
-# 2.  Core wrapper
+# 2.  Core wrappers (one pooled client per process, sync and async)
 # ------------------------------------------------------------------ #
+_client: openai.OpenAI | None = None
+_aclient: openai.AsyncOpenAI | None = None
+_loop: asyncio.AbstractEventLoop | None = None
+_client_lock = threading.Lock()
+
+
+def _api_key() -> str:
+    key = os.getenv("OPENAI_API_KEY")
+    if not key:
+        raise RuntimeError("OPENAI_API_KEY env-var missing")
+    return key
+
+
+def _sync_client() -> openai.OpenAI:
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = openai.OpenAI(api_key=_api_key())
+        return _client
+
+
+def _async_runtime() -> tuple[asyncio.AbstractEventLoop, openai.AsyncOpenAI]:
+    """
+    A background event loop that owns the AsyncOpenAI client.  Its httpx
+    pool is bound to that loop, so every batch (from any Streamlit thread)
+    is run there instead of in a throw-away `asyncio.run` loop.
+    """
+    global _loop, _aclient
+    with _client_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, daemon=True,
+                             name="llm-async-loop").start()
+            _aclient = openai.AsyncOpenAI(api_key=_api_key())
+        return _loop, _aclient
+
+
+def _cache_for(model: str, temperature: float, payload: list[dict],
+               cache: bool | None):
+    """(cache, key) if this call should be cached, else (None, None)."""
+    if cache is None:
+        cache = temperature == 0             # deterministic calls: on by default
+    store = get_llm_cache() if cache else None
+    return (store, cache_key(model, temperature, payload)) if store else (None, None)
+
+
 def _gpt_chat(
     messages: List[ChatMessage],
     *,
     model: str = "gpt-3.5-turbo",          # or gpt-4o-mini, gpt-4o etc.
     temperature: float = 0.7,
+    cache: bool | None = None,
 ) -> str:
     """
     Send a chat-completion request to OpenAI and return the **full**
     assistant reply as a plain string (no streaming).
+
+    Replies are served from / stored in the disk cache (llm_cache) when
+    `cache` is True, or by default when `temperature == 0`.
     """
-    openai.api_key = os.getenv("OPENAI_API_KEY")
-    if not openai.api_key:
-        raise RuntimeError("OPENAI_API_KEY env-var missing")
+    payload = [m.model_dump() for m in messages]
+    store, key = _cache_for(model, temperature, payload, cache)
+    if store and (hit := store.get(key)) is not None:
+        return hit
+
+    resp = _sync_client().chat.completions.create(
+        model=model,
+        messages=payload,
+        temperature=temperature,
+    )
+    reply = resp.choices[0].message.content.strip()
+    if store:
+        store.put(key, model, reply)
+    return reply
 
-    resp = openai.chat.completions.create(
+
+def _gpt_chat_stream(
+    messages: List[ChatMessage],
+    *,
+    model: str = "gpt-3.5-turbo",
+    temperature: float = 0.7,
+    cache: bool | None = None,
+) -> Iterator[str]:
+    """Like `_gpt_chat` but yields content deltas as they arrive (a cache hit is one delta)."""
+    payload = [m.model_dump() for m in messages]
+    store, key = _cache_for(model, temperature, payload, cache)
+    if store and (hit := store.get(key)) is not None:
+        yield hit
+        return
+
+    stream = _sync_client().chat.completions.create(
         model=model,
-        messages=[m.model_dump() for m in messages],
+        messages=payload,
         temperature=temperature,
+        stream=True,
     )
-    return resp.choices[0].message.content.strip()
+    parts = []
+    for chunk in stream:
+        delta = chunk.choices[0].delta.content if chunk.choices else None
+        if delta:
+            parts.append(delta)
+            yield delta
+    if store:
+        store.put(key, model, "".join(parts).strip())
+
+
+async def _agpt_chat(
+    messages: List[ChatMessage],
+    *,
+    model: str = "gpt-3.5-turbo",
+    temperature: float = 0.7,
+    cache: bool | None = None,
+) -> str:
+    """Async twin of `_gpt_chat`; must run on the loop from `_async_runtime`."""
+    payload = [m.model_dump() for m in messages]
+    store, key = _cache_for(model, temperature, payload, cache)
+    if store and (hit := await asyncio.to_thread(store.get, key)) is not None:
+        return hit
+
+    _, aclient = _async_runtime()
+    resp = await aclient.chat.completions.create(
+        model=model,
+        messages=payload,
+        temperature=temperature,
+    )
+    reply = resp.choices[0].message.content.strip()
+    if store:
+        await asyncio.to_thread(store.put, key, model, reply)
+    return reply
+
+
+def run_concurrently(calls: Sequence[Awaitable[Any]], *, limit: int = 4) -> list[Any]:
+    """
+    Run independent coroutines (typically `_agpt_chat(...)`) on the shared
+    loop, at most `limit` at a time; block until all finish, keep order.
+    The first exception is re-raised after the others have completed.
+    """
+    loop, _ = _async_runtime()
+
+    async def _bounded():
+        sem = asyncio.Semaphore(limit)
+        async def one(c):
+            async with sem:
+                return await c
+        return await asyncio.gather(*(one(c) for c in calls), return_exceptions=True)
+
+    results = asyncio.run_coroutine_threadsafe(_bounded(), loop).result()
+    for r in results:
+        if isinstance(r, BaseException):
+            raise r
+    return results
+
+
+def gpt_chat_batch(
+    batch: Sequence[List[ChatMessage] | tuple[List[ChatMessage], dict]],
+    *,
+    limit: int = 4,
+) -> list[str]:
+    """`_gpt_chat` over many prompts at once: items are messages or (messages, kwargs)."""
+    calls = []
+    for item in batch:
+        msgs, kw = item if isinstance(item, tuple) else (item, {})
+        calls.append(_agpt_chat(msgs, **kw))
+    return run_concurrently(calls, limit=limit)
 
 
 # ------------------------------------------------------------------ #
-# 3.  Public helpers
+# 3.  Prompt builders (shared by the sync and batched paths)
 # ------------------------------------------------------------------ #
-def summarise_resume(resume_text: str) -> str:
-    messages = [
+def _resume_messages(resume_text: str) -> List[ChatMessage]:
+    return [
         ChatMessage(role="system", content="You are a recruitment assistant."),
         ChatMessage(
             role="user",
@@ -58,11 +212,10 @@ def summarise_resume(resume_text: str) -> str:
             ),
         ),
     ]
-    return _gpt_chat(messages)
 
 
-def summarise_jd(jd_text: str) -> str:
-    messages = [
+def _jd_messages(jd_text: str) -> List[ChatMessage]:
+    return [
         ChatMessage(role="system",
                     content="You summarise job-descriptions for recruiters."),
         ChatMessage(
@@ -75,10 +228,9 @@ def summarise_jd(jd_text: str) -> str:
             ),
         ),
     ]
-    return _gpt_chat(messages)
 
 
-def rank_skills(skills: set[str], resume: str) -> list[str]:
+def _rank_messages(skills: set[str], resume: str) -> List[ChatMessage]:
     prompt = (
         "Below is a candidate résumé followed by a list of skills.\n"
         "Pick the FIVE most important skills for this candidate. "
@@ -86,6 +238,109 @@ def rank_skills(skills: set[str], resume: str) -> list[str]:
         f"RESUME:\n{resume}\n\n"
         f"SKILLS:\n{', '.join(sorted(skills))}"
     )
-    raw = _gpt_chat([ChatMessage(role="user", content=prompt)], temperature=0)
-    first_line = raw.splitlines()[0]
-    return [s.strip() for s in first_line.split(",") if s.strip()][:5]
\ No newline at end of file
+    return [ChatMessage(role="user", content=prompt)]
+
+
+def _parse_ranked(raw: str) -> list[str]:
+    first_line = raw.splitlines()[0] if raw else ""
+    return [s.strip() for s in first_line.split(",") if s.strip()][:5]
+
+
+# ------------------------------------------------------------------ #
+# 4.  Map step for long documents
+# ------------------------------------------------------------------ #
+def _map_messages(chunk: str, kind: str) -> List[ChatMessage]:
+    return [ChatMessage(
+        role="user",
+        content=(
+            f"Below is one section of a {kind}. Condense it into terse notes "
+            "(≤ 120 words). Keep every skill, technology, tool, degree, "
+            "employer, job title, date, metric and requirement verbatim; drop "
+            "boilerplate and prose.\n\n"
+            f"{chunk}"
+        ),
+    )]
+
+
+def condense_documents(docs: Sequence[tuple[str, str]]) -> list[str]:
+    """
+    [(text, kind), …] → text to prompt with.  Short documents pass through;
+    long ones are chunked by section (within DOC_TOKEN_BUDGET) and every
+    chunk of every document is condensed concurrently, so latency stays
+    ~one call however long the documents are.  Map calls run at
+    temperature 0 and therefore hit the LLM cache on repeat uploads.
+    """
+    plans: list[list[str] | None] = []
+    batch: list[tuple[List[ChatMessage], dict]] = []
+    for text, kind in docs:
+        if count_tokens(text) <= MAP_TRIGGER_TOKENS:
+            plans.append(None)
+            continue
+        chunks = chunk_document(text, chunk_tokens=CHUNK_TOKENS, budget=DOC_TOKEN_BUDGET)
+        plans.append(chunks)
+        batch += [(_map_messages(c, kind), {"temperature": 0}) for c in chunks]
+
+    notes = iter(gpt_chat_batch(batch, limit=MAP_CONCURRENCY) if batch else [])
+    return [text if plan is None else "\n\n".join(next(notes) for _ in plan)
+            for (text, _), plan in zip(docs, plans)]
+
+
+def condense(text: str, kind: str) -> str:
+    return condense_documents([(text, kind)])[0]
+
+
+# ------------------------------------------------------------------ #
+# 5.  Public helpers
+# ------------------------------------------------------------------ #
+# Summaries are sampled (temperature 0.7) but one per document is all we
+# want, so they opt in to the cache – the same JD is uploaded again and again.
+def summarise_resume(resume_text: str) -> str:
+    return _gpt_chat(_resume_messages(condense(resume_text, "résumé")), cache=True)
+
+
+def summarise_jd(jd_text: str) -> str:
+    return _gpt_chat(_jd_messages(condense(jd_text, "job description")), cache=True)
+
+
+def rank_skills(skills: set[str], resume: str) -> list[str]:
+    raw = _gpt_chat(_rank_messages(skills, condense(resume, "résumé")), temperature=0)
+    return _parse_ranked(raw)
+
+
+def analyse_texts(
+    docs: Sequence[tuple[str, str, set[str]]],
+    *,
+    limit: int = 4,
+) -> list[tuple[str, list[str]]]:
+    """
+    [(text, kind, skills), …] → [(summary, top5), …] with every summary and
+    ranking call in flight at once.  kind is "résumé" or "job description".
+    """
+    texts = condense_documents([(text, kind) for text, kind, _ in docs])
+    batch: list[tuple[List[ChatMessage], dict]] = []
+    for (_, kind, skills), text in zip(docs, texts):
+        summary = _resume_messages(text) if kind == "résumé" else _jd_messages(text)
+        batch += [(summary, {"cache": True}),
+                  (_rank_messages(skills, text), {"temperature": 0})]
+    out = gpt_chat_batch(batch, limit=limit)
+    return [(out[i], _parse_ranked(out[i + 1])) for i in range(0, len(out), 2)]
+
+
+def analyse_documents(
+    resume_text: str,
+    jd_text: str,
+    resume_skills: set[str],
+    jd_skills: set[str],
+    *,
+    limit: int = 4,
+) -> tuple[str, str, list[str], list[str]]:
+    """
+    The four upload-time calls (two summaries, two skill rankings) issued
+    concurrently: wall time ≈ the slowest call, not the sum.  Long documents
+    get one extra concurrent map round first (see `condense_documents`).
+    Returns (resume_summary, jd_summary, resume_top5, jd_top5).
+    """
+    (res_sum, res_top), (jd_sum, jd_top) = analyse_texts(
+        [(resume_text, "résumé", resume_skills), (jd_text, "job description", jd_skills)],
+        limit=limit)
+    return res_sum, jd_sum, res_top, jd_top
@@ -1,9 +1,9 @@
 # make_voice.py
 from pathlib import Path
-from TTS.api import TTS
+from tts_backends import get_tts
 
-# -- 1. load model (cached after first run) -------------------
-tts = TTS(model_name="tts_models/en/ljspeech/glow-tts", progress_bar=False)
+# -- 1. local Coqui backend ($COQUI_MODEL, loaded once) -------
+tts = get_tts("coqui")
 
 # -- 2. sentence to speak -------------------------------------
 text = "Hello, how are you? Welcome to the interview."
@@ -14,5 +14,5 @@ out_dir.mkdir(exist_ok=True)
 wav_path = out_dir / "interviewer.wav"
 
 # -- 4. synthesize --------------------------------------------
-tts.tts_to_file(text=text, file_path=wav_path)
+tts.to_wav(text, wav_path)
 print("✅  Saved ->", wav_path.resolve())
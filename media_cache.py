@@ -0,0 +1,143 @@
+# media_cache.py
+# --------------------------------------------------------------
+# Content-addressed disk cache for synthesized speech (WAV) and rendered
+# avatar clips (MP4).  Fixed lines such as the greeting are produced
+# once and then served from disk: no TTS call, no SadTalker render.
+#
+#   key(wav) = sha256(text, TTS backend.cache_id(): engine, voice, settings, model)
+#   key(mp4) = sha256(key(wav), avatar image sha256, render settings)
+#
+# The index lives in SQLite so several Streamlit workers can share it.
+# --------------------------------------------------------------
+from __future__ import annotations
+
+import hashlib, json, os, shutil, sqlite3, threading, time
+from pathlib import Path
+
+ROOT        = Path(__file__).resolve().parent
+CACHE_DIR   = Path(os.getenv("MEDIA_CACHE_DIR", ROOT / ".cache" / "media"))
+MAX_BYTES   = int(os.getenv("MEDIA_CACHE_MAX_MB", "2048")) * 1024 * 1024
+
+
+def _digest(*parts) -> str:
+    blob = json.dumps(parts, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+_file_hashes: dict[tuple[str, int, int], str] = {}
+
+def file_sha256(path) -> str:
+    """sha256 of a file, memoised on (path, mtime, size) so the avatar is read once."""
+    st = os.stat(path)
+    k = (str(Path(path).resolve()), st.st_mtime_ns, st.st_size)
+    if k not in _file_hashes:
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        _file_hashes[k] = h.hexdigest()
+    return _file_hashes[k]
+
+
+def tts_key(text: str, voice) -> str:
+    """Cache key for one synthesized line; `voice` is the backend's cache_id()."""
+    return _digest("tts", text.strip(), voice)
+
+
+def clip_key(wav_key: str, avatar_path, render_settings=None) -> str:
+    """Cache key for the avatar clip driven by the audio behind `wav_key`."""
+    return _digest("clip", wav_key, file_sha256(avatar_path), render_settings)
+
+
+class MediaCache:
+    """Size-capped LRU of media files; `get`/`put` are safe across processes."""
+
+    def __init__(self, root: Path = CACHE_DIR, max_bytes: int = MAX_BYTES):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        with self._db() as db:
+            db.executescript("""
+                CREATE TABLE IF NOT EXISTS entries(
+                    key TEXT, kind TEXT, size INTEGER, last_access REAL,
+                    PRIMARY KEY(key, kind));
+                CREATE TABLE IF NOT EXISTS stats(
+                    kind TEXT PRIMARY KEY, hits INTEGER, misses INTEGER);
+            """)
+
+    def _db(self) -> sqlite3.Connection:
+        con = getattr(self._local, "con", None)
+        if con is None:                         # one connection per thread
+            con = sqlite3.connect(self.root / "index.sqlite", timeout=30,
+                                  isolation_level=None)
+            con.execute("PRAGMA journal_mode=WAL")
+            self._local.con = con
+        return con
+
+    def _path(self, key: str, kind: str) -> Path:
+        return self.root / key[:2] / f"{key}.{kind}"
+
+    def _count(self, kind: str, hit: bool):
+        col = "hits" if hit else "misses"
+        self._db().execute(
+            f"INSERT INTO stats(kind, hits, misses) VALUES(?, ?, ?) "
+            f"ON CONFLICT(kind) DO UPDATE SET {col} = {col} + 1",
+            (kind, int(hit), int(not hit)))
+
+    # public API
+    def get(self, key: str, kind: str) -> Path | None:
+        """Cached file for (key, kind) or None; a hit refreshes its LRU stamp."""
+        path = self._path(key, kind)
+        hit = path.exists()
+        if hit:
+            self._db().execute(
+                "UPDATE entries SET last_access=? WHERE key=? AND kind=?",
+                (time.time(), key, kind))
+        self._count(kind, hit)
+        return path if hit else None
+
+    def put(self, key: str, kind: str, src, *, move: bool = False) -> Path:
+        """Copy (or, with `move`, move) `src` into the cache atomically and
+        return the cached path."""
+        dst = self._path(key, kind)
+        dst.parent.mkdir(exist_ok=True)
+        tmp = dst.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        if move:
+            shutil.move(src, tmp)                   # a rename on the same filesystem
+        else:
+            shutil.copyfile(src, tmp)
+        os.replace(tmp, dst)
+        self._db().execute(
+            "INSERT OR REPLACE INTO entries(key, kind, size, last_access) "
+            "VALUES(?, ?, ?, ?)", (key, kind, dst.stat().st_size, time.time()))
+        self.evict()
+        return dst
+
+    def evict(self):
+        """Drop least-recently-used files until the cache fits `max_bytes`."""
+        db = self._db()
+        total = db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, kind, size in db.execute(
+                "SELECT key, kind, size FROM entries ORDER BY last_access").fetchall():
+            self._path(key, kind).unlink(missing_ok=True)
+            db.execute("DELETE FROM entries WHERE key=? AND kind=?", (key, kind))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        """{"wav": {"hits": …, "misses": …}, "mp4": {…}} across all processes."""
+        rows = self._db().execute("SELECT kind, hits, misses FROM stats").fetchall()
+        return {k: {"hits": h, "misses": m} for k, h, m in rows}
+
+
+_cache: MediaCache | None = None
+
+def get_media_cache() -> MediaCache:
+    global _cache
+    if _cache is None:
+        _cache = MediaCache()
+    return _cache
@@ -0,0 +1,75 @@
+# model_registry.py
+# --------------------------------------------------------------
+# Process-wide home for heavy models.  Nothing is loaded at import:
+# a model is built on first `get()` (or by `warm()` in the background)
+# and then shared by every session / thread in the process.
+# --------------------------------------------------------------
+from __future__ import annotations
+
+import threading, time
+from typing import Any, Callable
+
+_loaders: dict[str, Callable[[], Any]] = {}
+_models:  dict[str, Any] = {}
+_locks:   dict[str, threading.Lock] = {}
+_load_s:  dict[str, float] = {}
+_registry_lock = threading.Lock()
+
+
+def register(name: str, loader: Callable[[], Any]):
+    """Declare how to build `name`; cheap, nothing is loaded yet."""
+    with _registry_lock:
+        _loaders[name] = loader
+        _locks.setdefault(name, threading.Lock())
+
+
+def get(name: str) -> Any:
+    """The model, loading it on first use (concurrent callers wait for one load)."""
+    if name in _models:
+        return _models[name]
+    with _locks[name]:
+        if name not in _models:
+            t0 = time.perf_counter()
+            _models[name] = _loaders[name]()
+            _load_s[name] = time.perf_counter() - t0
+    return _models[name]
+
+
+def is_loaded(name: str) -> bool:
+    return name in _models
+
+
+def warm(*names: str) -> threading.Thread:
+    """Load `names` (default: everything registered) on a daemon thread."""
+    names = names or tuple(_loaders)
+
+    def _run():
+        for n in names:
+            try:
+                get(n)
+            except Exception as e:          # a failed warm-up just means a cold first use
+                print(f"[model_registry] warm-up of {n!r} failed: {e}")
+
+    t = threading.Thread(target=_run, daemon=True, name="model-warmup")
+    t.start()
+    return t
+
+
+def load_times() -> dict[str, float]:
+    """Seconds each loaded model took to build."""
+    return dict(_load_s)
+
+
+# ── the models this app uses ─────────────────────────────────────
+def _load_whisper():
+    import whisper
+    return whisper.load_model("small")               # CPU model is fine
+
+def _load_render_worker():
+    from render_worker import get_render_worker
+    w = get_render_worker()
+    w.wait_ready(timeout=600)                        # SadTalker checkpoints in memory
+    return w
+
+register("whisper", _load_whisper)
+register("sadtalker", _load_render_worker)
@@ -0,0 +1,163 @@
+# ───────────────────────── render_quality.py ─────────────────────────
+# Picks SadTalker quality per clip so renders fit a latency budget.
+#
+#   level 0  configured top (GFPGAN on, RENDER_TOP_SIZE px)
+#   level 1  GFPGAN off
+#   level 2  256 px face model
+#   level 3  idle loop video (or the still portrait) + the audio, no render
+#
+# The controller keeps a moving average of render seconds per audio
+# second for every level it has used and multiplies it by the clip length
+# and the number of renders queued ahead.  Over budget → one step down;
+# the level above predicted under `UP_HEADROOM` × budget for `UP_AFTER`
+# consecutive clips → one step up (while idle, old costs decay so the
+# controller eventually probes rendering again).  Every decision goes to stderr and,
+# with QUALITY_LOG set, to a JSONL file for tuning.
+# ─────────────────────────────────────────────────────────────────────
+from __future__ import annotations
+
+import json, os, subprocess, sys, threading, time, wave
+from dataclasses import dataclass, replace
+from pathlib import Path
+
+from render_worker import DEFAULT_SETTINGS, RenderSettings
+
+ROOT          = Path(__file__).resolve().parent
+BUDGET_S      = float(os.getenv("RENDER_BUDGET_S", "8"))     # per clip, request → MP4
+TOP_SIZE      = int(os.getenv("RENDER_TOP_SIZE", str(DEFAULT_SETTINGS.size)))
+IDLE_VIDEO    = ROOT / "assets" / "idle.mp4"
+LOG_PATH      = os.getenv("QUALITY_LOG")                     # e.g. .cache/render_quality.jsonl
+
+UP_HEADROOM   = 0.6
+UP_AFTER      = 3
+EWMA          = 0.3
+IDLE_DECAY    = 0.85                # while idle, forget old render costs so we re-probe
+# render s / audio s assumed for a level never measured, relative to the one above
+STEP_SPEEDUP  = {"no-gfpgan": 0.5, "256px": 0.4}
+
+
+@dataclass(frozen=True)
+class QualityLevel:
+    name: str
+    settings: RenderSettings | None     # None → idle loop + audio
+
+
+def quality_ladder(top: RenderSettings = DEFAULT_SETTINGS, top_size: int = TOP_SIZE):
+    top = replace(top, size=top_size)
+    steps = [QualityLevel("top", top),
+             QualityLevel("no-gfpgan", replace(top, enhancer=None)),
+             QualityLevel("256px", replace(top, enhancer=None, size=256))]
+    ladder, seen = [], set()
+    for lvl in steps:                   # 256 px top → "256px" equals "no-gfpgan"
+        if lvl.settings not in seen:
+            seen.add(lvl.settings); ladder.append(lvl)
+    return ladder + [QualityLevel("idle", None)]
+
+
+def audio_seconds(wav_path) -> float:
+    with wave.open(str(wav_path), "rb") as w:
+        return w.getnframes() / float(w.getframerate())
+
+
+class QualityController:
+    def __init__(self, budget_s: float = BUDGET_S, ladder: list[QualityLevel] | None = None):
+        self.budget_s = budget_s
+        self.ladder = ladder or quality_ladder()
+        self.level = 0
+        self.rate: dict[str, float] = {}    # level name → render s per audio s (EWMA)
+        self._calm = 0                      # consecutive clips with room to step up
+        self._scale, f = [], 1.0            # prior cost of each level relative to the top
+        for lvl in self.ladder:
+            f *= STEP_SPEEDUP.get(lvl.name, 1.0); self._scale.append(f)
+        self._lock = threading.Lock()
+
+    # ── prediction ──
+    def _rate(self, i: int) -> float | None:
+        """Measured rate of level i, else the nearest measured level's, scaled."""
+        if self.ladder[i].settings is None:
+            return 0.0
+        measured = [j for j, l in enumerate(self.ladder) if l.name in self.rate]
+        if not measured:
+            return None                     # nothing rendered yet: no opinion
+        j = min(measured, key=lambda j: abs(j - i))
+        return self.rate[self.ladder[j].name] * self._scale[i] / self._scale[j]
+
+    def predict(self, i: int, audio_s: float, queue_depth: int) -> float | None:
+        r = self._rate(i)
+        return None if r is None else r * audio_s * (1 + queue_depth)
+
+    # ── decisions ──
+    def choose(self, audio_s: float, queue_depth: int = 0) -> QualityLevel:
+        """Level for the next clip; may step one level down or up."""
+        with self._lock:
+            before, i = self.level, self.level
+            if self.ladder[i].settings is None:         # nothing rendered to measure
+                self.rate = {k: v * IDLE_DECAY for k, v in self.rate.items()}
+            cur = self.predict(i, audio_s, queue_depth)
+            if cur is not None and cur > self.budget_s and i < len(self.ladder) - 1:
+                i += 1; self._calm = 0
+                reason = f"predicted {cur:.1f}s > budget {self.budget_s:.1f}s"
+            elif i > 0:
+                up = self.predict(i - 1, audio_s, queue_depth)
+                if up is not None and up < UP_HEADROOM * self.budget_s:
+                    self._calm += 1
+                    reason = (f"headroom {self._calm}/{UP_AFTER}: "
+                              f"{self.ladder[i - 1].name} predicted {up:.1f}s")
+                    if self._calm >= UP_AFTER:
+                        i -= 1; self._calm = 0
+                else:
+                    self._calm = 0
+                    reason = "holding"
+            else:
+                reason = "top quality"
+            self.level = i
+            self._log("choose", before=self.ladder[before].name, level=self.ladder[i].name,
+                      audio_s=round(audio_s, 2), queue=queue_depth, reason=reason,
+                      predicted=None if cur is None else round(cur, 2))
+            return self.ladder[i]
+
+    def record(self, level: QualityLevel, audio_s: float, render_s: float):
+        """Feed back one finished render; `render_s` excludes queue wait,
+        which `predict` accounts for through `queue_depth`."""
+        if level.settings is None or audio_s <= 0:
+            return
+        with self._lock:
+            r = render_s / audio_s
+            old = self.rate.get(level.name)
+            self.rate[level.name] = r if old is None else (1 - EWMA) * old + EWMA * r
+            self._log("render", level=level.name, audio_s=round(audio_s, 2),
+                      render_s=round(render_s, 2), rate=round(self.rate[level.name], 3))
+
+    def _log(self, event: str, **row):
+        row = {"ts": time.time(), "event": event, **row}
+        print("[quality] " + " ".join(f"{k}={v}" for k, v in row.items() if k != "ts"),
+              file=sys.stderr)
+        if LOG_PATH:
+            Path(LOG_PATH).parent.mkdir(parents=True, exist_ok=True)
+            with open(LOG_PATH, "a", encoding="utf-8") as f:
+                f.write(json.dumps(row) + "\n")
+
+
+# ── the cheapest level: no render at all ──
+def idle_clip(wav_path, out_path, *, portrait: Path) -> str:
+    """MP4 of the idle loop (or the still portrait) under `wav_path`'s audio."""
+    if IDLE_VIDEO.exists():
+        video = ["-stream_loop", "-1", "-i", str(IDLE_VIDEO)]
+    else:
+        video = ["-loop", "1", "-framerate", "25", "-i", str(portrait)]
+    subprocess.run(["ffmpeg", "-y", "-loglevel", "error", *video, "-i", str(wav_path),
+                    "-map", "0:v", "-map", "1:a", "-c:v", "libx264", "-pix_fmt", "yuv420p",
+                    "-vf", "scale=trunc(iw/2)*2:trunc(ih/2)*2",
+                    "-c:a", "aac", "-shortest", str(out_path)], check=True)
+    return str(out_path)
+
+
+_controller: QualityController | None = None
+_controller_lock = threading.Lock()
+
+def get_quality_controller() -> QualityController:
+    global _controller
+    with _controller_lock:
+        if _controller is None:
+            _controller = QualityController()
+        return _controller
@@ -0,0 +1,313 @@
+# render_worker.py
+# --------------------------------------------------------------
+# Long-lived SadTalker process.  Checkpoints (and GFPGAN) are loaded
+# once; render jobs arrive on a queue and resolve a Future in the caller.
+# The source-image preprocessing (face detection, crop, landmarks, 3DMM
+# fit) is done once per image content + size + preprocess mode and kept
+# under .cache/sadtalker_src/, so a fixed portrait only pays for it once.
+#
+#   caller ─ submit() ─▶ job_q ─▶ [worker: warm SadTalker] ─▶ result_q
+#      ▲                                                         │
+#      └──────────── Future.set_result(mp4) ◀── collector thread ┘
+# --------------------------------------------------------------
+from __future__ import annotations
+
+import atexit, itertools, os, pickle, shutil, sys, threading, time, traceback, uuid
+import multiprocessing as mp
+from concurrent.futures import Future
+from dataclasses import dataclass, asdict
+from pathlib import Path
+
+ROOT          = Path(__file__).resolve().parent
+SADTALKER_DIR = Path(os.getenv("SADTALKER_DIR", ROOT / "SadTalker")).resolve()
+RESULTS_DIR   = ROOT / "results"
+SOURCE_CACHE  = Path(os.getenv("SADTALKER_SOURCE_CACHE", ROOT / ".cache" / "sadtalker_src"))
+AVATAR_IMG    = ROOT / "assets" / "avatar.png"
+
+
+@dataclass(frozen=True)
+class RenderSettings:
+    """The SadTalker knobs we actually vary (mirrors inference.py flags)."""
+    preprocess: str = "full"
+    still: bool = True
+    enhancer: str | None = "gfpgan"
+    size: int = 256
+    batch_size: int = 2
+    pose_style: int = 0
+    expression_scale: float = 1.0
+
+
+DEFAULT_SETTINGS = RenderSettings()
+
+
+# ── worker side (runs in the child process) ──────────────────────
+class _SadTalkerPipeline:
+    """inference.py split in two: model loading (once) and rendering (per job)."""
+
+    def __init__(self, sadtalker_dir: Path):
+        os.chdir(sadtalker_dir)                     # SadTalker uses relative paths
+        sys.path.insert(0, str(sadtalker_dir))
+
+        import torch
+        from src.utils import face_enhancer
+
+        self.dir    = sadtalker_dir
+        self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        self._models: dict[tuple[int, str], tuple] = {}
+        self._sources: dict[tuple[str, int, str], tuple] = {}
+
+        # face_enhancer builds a fresh GFPGANer on every call – memoise it
+        # so the GFPGAN weights are read from disk once per process.
+        ctor, restorers = face_enhancer.GFPGANer, {}
+        def _cached_restorer(**kw):
+            key = tuple(sorted((k, str(v)) for k, v in kw.items()))
+            if key not in restorers:
+                restorers[key] = ctor(**kw)
+            return restorers[key]
+        face_enhancer.GFPGANer = _cached_restorer
+
+    def models(self, size: int, preprocess: str) -> tuple:
+        """(CropAndExtract, Audio2Coeff, AnimateFromCoeff) for one size/preprocess."""
+        key = (size, preprocess)
+        if key not in self._models:
+            from src.utils.init_path import init_path
+            from src.utils.preprocess import CropAndExtract
+            from src.test_audio2coeff import Audio2Coeff
+            from src.facerender.animate import AnimateFromCoeff
+
+            paths = init_path(str(self.dir / "checkpoints"),
+                              str(self.dir / "src" / "config"),
+                              size, False, preprocess)
+            self._models[key] = (CropAndExtract(paths, self.device),
+                                 Audio2Coeff(paths, self.device),
+                                 AnimateFromCoeff(paths, self.device))
+        return self._models[key]
+
+    def source(self, image: str, size: int, preprocess: str) -> tuple:
+        """(first_coeff .mat, cropped png, crop_info) for `image`, computed once."""
+        from media_cache import file_sha256                 # memoised on mtime / size
+        sha = file_sha256(image)[:16]
+        key = (sha, size, preprocess)
+        hit = self._sources.get(key)
+        if hit and all(Path(p).exists() for p in hit[:2]):
+            return hit
+
+        d = SOURCE_CACHE / f"{sha}-{size}-{preprocess}"
+        try:
+            with (d / "source.pkl").open("rb") as f:
+                coeff, pic, crop_info = pickle.load(f)
+            hit = (str(d / coeff), str(d / pic), crop_info)
+            if all(Path(p).exists() for p in hit[:2]):
+                self._sources[key] = hit
+                return hit
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+            pass
+
+        crop = self.models(size, preprocess)[0]
+        tmp = d.with_name(f"{d.name}.{os.getpid()}.tmp")
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir(parents=True)
+        coeff, pic, crop_info = crop.generate(image, str(tmp), preprocess,
+                                              source_image_flag=True, pic_size=size)
+        if coeff is None:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise RuntimeError(f"SadTalker found no face in {image}")
+        with (tmp / "source.pkl").open("wb") as f:        # names only: the dir moves
+            pickle.dump((Path(coeff).name, Path(pic).name, crop_info), f)
+        shutil.rmtree(d, ignore_errors=True)
+        os.replace(tmp, d)
+        self._sources[key] = hit = (str(d / Path(coeff).name), str(d / Path(pic).name), crop_info)
+        return hit
+
+    def render(self, image: str, audio: str, result_dir: str,
+               output_name: str | None, settings: RenderSettings) -> str:
+        from src.generate_batch import get_data
+        from src.generate_facerender_batch import get_facerender_data
+
+        s = settings
+        _, audio2coeff, animate = self.models(s.size, s.preprocess)
+        first_coeff, crop_pic, crop_info = self.source(image, s.size, s.preprocess)
+
+        save_dir = Path(result_dir) / f"{time.strftime('%Y_%m_%d_%H.%M.%S')}_{uuid.uuid4().hex[:6]}"
+        save_dir.mkdir(parents=True, exist_ok=True)
+
+        batch = get_data(first_coeff, audio, self.device, None, still=s.still)
+        coeff_path = audio2coeff.generate(batch, str(save_dir), s.pose_style, None)
+        data = get_facerender_data(
+            coeff_path, crop_pic, first_coeff, audio, s.batch_size,
+            None, None, None,
+            expression_scale=s.expression_scale, still_mode=s.still,
+            preprocess=s.preprocess, size=s.size)
+        video = animate.generate(data, str(save_dir), image, crop_info,
+                                 enhancer=s.enhancer, background_enhancer=None,
+                                 preprocess=s.preprocess, img_size=s.size)
+
+        out = Path(result_dir) / f"{output_name or save_dir.name}.mp4"
+        shutil.move(video, out)
+        shutil.rmtree(save_dir, ignore_errors=True)
+        return str(out)
+
+
+def _worker_main(job_q, result_q, sadtalker_dir: str, warm: dict | None,
+                 warm_image: str | None):
+    pipe = _SadTalkerPipeline(Path(sadtalker_dir))
+    if warm is not None:                            # pay the load cost up front
+        warm_settings = RenderSettings(**warm)
+        pipe.models(warm_settings.size, warm_settings.preprocess)
+        if warm_image:
+            try:
+                pipe.source(warm_image, warm_settings.size, warm_settings.preprocess)
+            except Exception:
+                traceback.print_exc()               # the first render will report it
+    result_q.put(("ready", True, None))
+
+    while True:
+        job = job_q.get()
+        if job is None:                             # shutdown sentinel
+            break
+        job_id, image, audio, result_dir, output_name, settings = job
+        try:
+            t0 = time.perf_counter()
+            mp4 = pipe.render(image, audio, result_dir, output_name,
+                              RenderSettings(**settings))
+            result_q.put((job_id, True, (mp4, time.perf_counter() - t0)))
+        except Exception:
+            result_q.put((job_id, False, traceback.format_exc()))
+
+
+# ── caller side ──────────────────────────────────────────────────
+class RenderWorker:
+    """Owns one warm SadTalker process; `submit` returns a Future[str] (MP4 path)."""
+
+    def __init__(self, sadtalker_dir: Path = SADTALKER_DIR,
+                 warm: RenderSettings | None = DEFAULT_SETTINGS,
+                 warm_image: Path | None = AVATAR_IMG):
+        self.sadtalker_dir = Path(sadtalker_dir)
+        self.warm = warm
+        self.warm_image = warm_image if warm_image and Path(warm_image).exists() else None
+        self._ctx = mp.get_context("spawn")         # never fork a torch process
+        self._ids = itertools.count()
+        self._pending: dict[int, Future] = {}
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._proc = None
+
+    # lifecycle
+    def start(self) -> "RenderWorker":
+        with self._lock:
+            if self._proc is not None and self._proc.is_alive():
+                return self
+            self._job_q    = self._ctx.Queue()
+            self._result_q = self._ctx.Queue()
+            self._ready.clear()
+            self._proc = self._ctx.Process(
+                target=_worker_main, daemon=True, name="sadtalker-worker",
+                args=(self._job_q, self._result_q, str(self.sadtalker_dir),
+                      asdict(self.warm) if self.warm else None,
+                      str(Path(self.warm_image).resolve()) if self.warm_image else None))
+            self._proc.start()
+            threading.Thread(target=self._collect, args=(self._proc, self._result_q),
+                             daemon=True, name="sadtalker-collector").start()
+        return self
+
+    def close(self, timeout: float = 10.0):
+        with self._lock:
+            proc, self._proc = self._proc, None
+        if proc is None:
+            return
+        self._job_q.put(None)
+        proc.join(timeout)
+        if proc.is_alive():
+            proc.terminate()
+        self._fail_pending(RuntimeError("render worker closed"))
+
+    def wait_ready(self, timeout: float | None = None) -> bool:
+        return self._ready.wait(timeout)
+
+    def queue_depth(self) -> int:
+        """Renders submitted and not yet finished (including the running one)."""
+        with self._lock:
+            return len(self._pending)
+
+    # jobs
+    def submit(self, audio_path, image_path, *, result_dir=RESULTS_DIR,
+               output_name: str | None = None,
+               settings: RenderSettings = DEFAULT_SETTINGS) -> Future:
+        """Queue one render; the Future resolves to the absolute MP4 path and
+        then carries `render_s`, the worker's render time without queue wait."""
+        self.start()
+        Path(result_dir).mkdir(parents=True, exist_ok=True)
+        fut: Future = Future()
+        job_id = next(self._ids)
+        with self._lock:
+            self._pending[job_id] = fut
+        self._job_q.put((job_id, str(Path(image_path).resolve()),
+                         str(Path(audio_path).resolve()),
+                         str(Path(result_dir).resolve()),
+                         output_name, asdict(settings)))
+        return fut
+
+    def render(self, audio_path, image_path, timeout: float | None = None, **kw) -> str:
+        return self.submit(audio_path, image_path, **kw).result(timeout)
+
+    # internals
+    def _collect(self, proc, result_q):
+        while True:
+            try:
+                job_id, ok, payload = result_q.get(timeout=1.0)
+            except Exception:                       # queue.Empty
+                if not proc.is_alive():
+                    break
+                continue
+            if job_id == "ready":
+                self._ready.set()
+                continue
+            with self._lock:
+                fut = self._pending.pop(job_id, None)
+            if fut is None:
+                continue
+            if ok:
+                fut.render_s = payload[1]               # set before waiters wake up
+                fut.set_result(payload[0])
+            else:
+                fut.set_exception(RuntimeError(f"SadTalker render failed:\n{payload}"))
+        # the process died (crash / OOM): nobody will answer its pending jobs,
+        # unless start() already replaced it and the jobs belong to the new one
+        with self._lock:
+            replaced = self._proc is not None and self._proc is not proc
+        if not replaced:
+            self._fail_pending(RuntimeError(f"render worker exited (code {proc.exitcode})"))
+
+    def _fail_pending(self, exc: Exception):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for fut in pending.values():
+            if not fut.done():
+                fut.set_exception(exc)
+
+
+# ── process-wide singleton ───────────────────────────────────────
+_worker: RenderWorker | None = None
+_worker_lock = threading.Lock()
+
+
+def get_render_worker() -> RenderWorker:
+    """The shared warm worker (started on first use, stopped at exit)."""
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = RenderWorker().start()
+            atexit.register(_worker.close)
+        return _worker
+
+
+if __name__ == "__main__":
+    # python render_worker.py <audio.wav> [image.png]
+    audio = sys.argv[1]
+    image = sys.argv[2] if len(sys.argv) > 2 else AVATAR_IMG
+    w = get_render_worker()
+    t0 = time.perf_counter(); w.wait_ready()
+    print(f"models loaded in {time.perf_counter() - t0:.1f}s")
+    for i in range(2):
+        t0 = time.perf_counter()
+        print(w.render(audio, image), f"{time.perf_counter() - t0:.1f}s")
@@ -0,0 +1,55 @@
+# ───────────────────────── rerun_profiler.py ─────────────────────────
+# Wall time per section of one Streamlit script run (or fragment run).
+#
+#   prof = RerunProfiler("app")
+#   with prof.section("analysis"): …
+#   prof.report()        # one log line, + JSONL row if RERUN_PROFILE_LOG
+#
+# Off unless RERUN_PROFILE=1, in which case `section` costs two
+# perf_counter calls.  The JSONL log is what to diff before / after a UI
+# change: one row per run with its kind ("app" vs "interview") and ms per
+# section.
+# ─────────────────────────────────────────────────────────────────────
+from __future__ import annotations
+
+import json, os, sys, threading, time
+from contextlib import contextmanager
+from pathlib import Path
+
+ENABLED  = os.getenv("RERUN_PROFILE", "0") == "1"
+LOG_PATH = os.getenv("RERUN_PROFILE_LOG")           # e.g. .cache/rerun_profile.jsonl
+
+_log_lock = threading.Lock()
+
+
+class RerunProfiler:
+    def __init__(self, kind: str, *, enabled: bool = ENABLED):
+        self.kind, self.enabled = kind, enabled
+        self.t0 = time.perf_counter()
+        self.sections: dict[str, float] = {}
+
+    @contextmanager
+    def section(self, name: str):
+        if not self.enabled:
+            yield; return
+        t = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.sections[name] = self.sections.get(name, 0.0) + time.perf_counter() - t
+
+    def report(self) -> dict | None:
+        """Log this run's timings; returns the row (None when disabled)."""
+        if not self.enabled:
+            return None
+        row = {"ts": time.time(), "kind": self.kind,
+               "total_ms": round(1e3 * (time.perf_counter() - self.t0), 1),
+               **{k: round(1e3 * v, 1) for k, v in self.sections.items()}}
+        parts = " ".join(f"{k}={v:.0f}ms" for k, v in row.items() if k not in ("ts", "kind"))
+        print(f"[rerun] {self.kind}: {parts}", file=sys.stderr)
+        if LOG_PATH:
+            with _log_lock:
+                Path(LOG_PATH).parent.mkdir(parents=True, exist_ok=True)
+                with open(LOG_PATH, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(row) + "\n")
+        return row
@@ -1,16 +1,10 @@
-import subprocess
-import os
+from render_worker import RenderSettings, get_render_worker
 
 def animate_avatar(audio_file="sample.wav", image_file="avatar.png"):
-    sadtalker_dir = "SadTalker"  
-    command = [
-        "python", "inference.py",
-        "--driven_audio", f"../{audio_file}",
-        "--source_image", f"../{image_file}",
-        "--result_dir", "../results",
-        "--preprocess", "full",
-        "--enhancer", "gfpgan"
-    ]
     print("Starting avatar animation with SadTalker...")
-    subprocess.run(command, cwd=sadtalker_dir)
-    print("Animation complete. Check the 'results' folder.")
+    # the worker keeps the checkpoints loaded, so only the first call pays for them
+    # no --still, as this script always ran SadTalker (head pose moves)
+    video = get_render_worker().render(audio_file, image_file,
+                                       settings=RenderSettings(still=False))
+    print(f"Animation complete: {video}")
+    return video
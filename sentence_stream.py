@@ -0,0 +1,78 @@
+# sentence_stream.py
+# --------------------------------------------------------------
+# Turns a stream of LLM deltas into speakable pieces as soon as they
+# close, so TTS can start on sentence 1 while GPT is still writing 2+.
+# --------------------------------------------------------------
+from __future__ import annotations
+import re
+
+SENTENCE_END = ".!?…"
+CLAUSE_END   = ",;:—–"
+CLOSERS      = "\"'”’)]"
+# "e.g. foo" / "Dr. Smith" must not end a sentence
+ABBREVIATIONS = {"e.g", "i.e", "etc", "vs", "mr", "mrs", "ms", "dr", "prof",
+                 "sr", "jr", "st", "inc", "ltd", "co", "approx"}
+# …nor "No. 5" – but "the answer is no. Now…" does
+NUMBERED = {"no", "nos"}
+
+_BOUNDARY = re.compile(
+    rf"[{re.escape(SENTENCE_END + CLAUSE_END)}]+[{re.escape(CLOSERS)}]*(?=\s)")
+
+
+class SentenceChunker:
+    """
+    feed() deltas, get back complete pieces.
+
+    A piece ends at a sentence terminator once it is `min_chars` long, or at
+    a clause mark (, ; : —) once it is `clause_chars` long – long sentences
+    are split so the first audio isn't held back by a 40-word run-on.
+    A boundary only counts once the following whitespace has arrived, so
+    "3.5" or "Node.js" are never cut.
+    """
+
+    def __init__(self, min_chars: int = 20, clause_chars: int = 80):
+        self.min_chars = min_chars
+        self.clause_chars = clause_chars
+        self.buf = ""
+
+    def feed(self, delta: str) -> list[str]:
+        self.buf += delta
+        out, start = [], 0
+        for m in _BOUNDARY.finditer(self.buf):
+            piece = self.buf[start:m.end()]
+            size = len(piece.strip())
+            is_sentence = any(c in SENTENCE_END for c in m.group())
+            if is_sentence:
+                if size < self.min_chars or self._is_abbreviation(m.start()):
+                    continue
+            elif size < self.clause_chars:
+                continue
+            out.append(piece.strip())
+            start = m.end()
+        self.buf = self.buf[start:]
+        return out
+
+    def flush(self) -> str | None:
+        """Whatever is left at end-of-reply (None if only whitespace)."""
+        rest, self.buf = self.buf.strip(), ""
+        return rest or None
+
+    def _is_abbreviation(self, dot: int) -> bool:
+        if self.buf[dot] != ".":
+            return False
+        word = re.search(r"([\w.]+)$", self.buf[:dot])
+        if not word:
+            return False
+        word = word.group(1).lower()
+        if word in NUMBERED:                     # undecided until the next word arrives
+            after = self.buf[dot + 1:].lstrip(CLOSERS).lstrip()
+            return not after or after[0].isdigit()
+        return word in ABBREVIATIONS
+
+
+def split_sentences(text: str, **kw) -> list[str]:
+    """Non-streaming convenience: chunk a whole string the same way."""
+    chunker = SentenceChunker(**kw)
+    pieces = chunker.feed(text + " ")
+    rest = chunker.flush()
+    return pieces + ([rest] if rest else [])
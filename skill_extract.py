@@ -0,0 +1,172 @@
+# ───────────────────────── skill_extract.py ─────────────────────────
+# Taxonomy + heuristics that turn résumé / JD text into skill sets and
+# bullet lists.  Streamlit-free: app.py caches the nlp/matcher pair with
+# st.cache_resource, batch_screen.py feeds documents through nlp.pipe.
+#
+# Known skills (and their aliases: "k8s", "Postgres", "Google Cloud") are
+# found by the compiled taxonomy in skill_taxonomy.py and reported under
+# their canonical name, so overlaps compare like with like.
+#
+# Only taxonomy hits and noun_chunks are used, so the pipeline is
+# loaded without NER and the lemmatizer (noun_chunks needs tagger +
+# attribute_ruler for POS and the parser for DEP); with noun_chunks off
+# nothing but the tokenizer runs.
+from __future__ import annotations
+
+import re
+from pathlib import Path
+from typing import Iterable, Iterator
+
+import spacy, wordfreq
+from spacy.language import Language
+from spacy.tokens import Doc, DocBin
+
+from skill_taxonomy import TaxonomyIndex, get_taxonomy
+
+SPACY_MODEL = "en_core_web_sm"
+UNUSED_PIPES = ["ner", "lemmatizer", "senter"]
+
+# ─── matcher setup ──────────────────────────────────────────────
+STOP_WORDS = {*wordfreq.top_n_list("en", 2000),
+              *"january february march april … december".split(),
+              "responsibilities","summary","objective"}
+
+ACTION_VERBS = {"achieve","administer","advise","analyze","architect","build",
+    "collaborate","create","debug","define","design","develop","drive","enhance",
+    "establish","evaluate","execute","facilitate","implement","improve","lead",
+    "manage","optimize","organize","own","plan","prioritize","research","resolve",
+    "scale","support","test","troubleshoot","upgrade","validate","deliver",
+    "monitor","ensure","provide","partner","review"}
+
+CLEAN_SUFFIXES = (" programming"," development"," developer"," engineer",
+                  " language"," framework"," library")
+
+
+def load_nlp(*, pruned:bool=True) -> Language:
+    """en_core_web_sm, by default without the components skills never read."""
+    exclude = UNUSED_PIPES if pruned else []
+    try: return spacy.load(SPACY_MODEL, exclude=exclude)
+    except OSError:
+        from spacy.cli import download; download(SPACY_MODEL)
+        return spacy.load(SPACY_MODEL, exclude=exclude)
+
+
+def load_matcher() -> TaxonomyIndex:
+    """The compiled skill taxonomy (data/skills_taxonomy.json, or $SKILLS_TAXONOMY)."""
+    return get_taxonomy()
+
+# ─── extraction helpers ─────────────────────────────────────────
+def _norm(skill:str)->str:
+    s = skill.rstrip(".,;:- ").lower()
+    for suf in CLEAN_SUFFIXES:
+        if s.endswith(suf): s = s[:-len(suf)]
+    return s.strip()
+
+def _pretty(s:str)->str: return s.replace("_"," ").replace("-"," ").title()
+
+def canonical_skill(term:str, matcher:TaxonomyIndex|None=None)->str|None:
+    """Taxonomy name for a free-text skill ('postgres dev' → 'PostgreSQL'), else None."""
+    tx = matcher or get_taxonomy()
+    return tx.canonical_name(term.strip()) or tx.canonical_name(_norm(term))
+
+def normalise_skills(terms:Iterable[str], matcher:TaxonomyIndex|None=None)->set[str]:
+    """Canonical names where the taxonomy knows the term, cleaned-up text otherwise."""
+    out = set()
+    for t in terms:
+        canon = canonical_skill(t, matcher)
+        if canon: out.add(canon); continue
+        s = _norm(t)
+        if 2<len(s)<30 and s not in STOP_WORDS: out.add(_pretty(s))
+    return out
+
+def skills_from_doc(doc:Doc, matcher:TaxonomyIndex)->set[str]:
+    """Skills of an already-parsed doc (so callers can batch with nlp.pipe)."""
+    text = doc.text
+    known = {matcher.names[sid] for sid in matcher.find_ids(text)}
+    other = set()
+    sec = re.search(r"(?i)skills?\s*[:-–]\s*(.+)", text.replace("\n"," "))
+    if sec: other.update(re.split(r"[·•,;/]", sec.group(1)))
+    if doc.has_annotation("DEP"):
+        for ch in doc.noun_chunks:
+            if 1<=len(ch)<=3 and (ch.text.istitle() or
+               re.fullmatch(r"[A-Z0-9+#\-.]{2,}", ch.text)) and \
+               not matcher.needs_context(ch.text):      # bare "C" / "Excel": find() decided
+                other.add(ch.text)
+    return known | normalise_skills(other, matcher)
+
+def extract_skills(text:str, nlp:Language, matcher:TaxonomyIndex)->set[str]:
+    return skills_from_doc(nlp(text), matcher)
+
+def extract_skills_many(texts:Iterable[str], nlp:Language, matcher:TaxonomyIndex, *,
+                        batch_size:int=32, n_process:int=1)->Iterator[set[str]]:
+    """Skill sets for many texts, in order, parsed with nlp.pipe."""
+    for doc in nlp.pipe(texts, batch_size=batch_size, n_process=n_process):
+        yield skills_from_doc(doc, matcher)
+
+class SkillExtractor:
+    """
+    nlp + taxonomy bundled for reuse: batch parsing, skill sets, and DocBin
+    round-trips so a corpus parsed once can be re-scored without spaCy.
+
+        ex = SkillExtractor()                      # pruned pipeline
+        ex = SkillExtractor(noun_chunks=False)     # tokenizer only, fastest
+    """
+
+    def __init__(self, nlp:Language|None=None, *, noun_chunks:bool=True):
+        self.nlp = nlp or load_nlp()
+        self.matcher = load_matcher()
+        self.noun_chunks = noun_chunks
+
+    def parse(self, texts:Iterable[str], *, batch_size:int=32,
+              n_process:int=1) -> Iterator[Doc]:
+        if not self.noun_chunks:                   # taxonomy + regex need tokens only
+            return self.nlp.tokenizer.pipe(texts, batch_size=batch_size)
+        return self.nlp.pipe(texts, batch_size=batch_size, n_process=n_process)
+
+    def __call__(self, text:str) -> set[str]:
+        return skills_from_doc(next(iter(self.parse([text]))), self.matcher)
+
+    def pipe(self, texts:Iterable[str], **kw) -> Iterator[set[str]]:
+        for doc in self.parse(texts, **kw):
+            yield skills_from_doc(doc, self.matcher)
+
+    # ── DocBin persistence ──
+    @staticmethod
+    def save_docs(docs:Iterable[Doc], path) -> int:
+        db = DocBin(store_user_data=False)
+        n = 0
+        for doc in docs:
+            db.add(doc); n += 1
+        Path(path).write_bytes(db.to_bytes())
+        return n
+
+    def load_docs(self, path) -> Iterator[Doc]:
+        return DocBin().from_bytes(Path(path).read_bytes()).get_docs(self.nlp.vocab)
+
+    def skills_from_docbin(self, path) -> Iterator[set[str]]:
+        for doc in self.load_docs(path):
+            yield skills_from_doc(doc, self.matcher)
+
+def extract_bullets(text:str)->list[str]:
+    bullets=[]; clean=text.replace("\xa0"," ")
+    rx = re.compile(r"^[ \t]*(?:[-–—•*]|[\u2022-\u2024])[ \t]*(.+?)(?=\n|$)", re.M)
+    bullets+= [l.strip() for l in rx.findall(clean)]
+    if len(bullets)<10:
+        sent_rx=re.compile(r"^[A-Z][^.\n]{10,150}$", re.M)
+        for line in sent_rx.findall(clean):
+            if line.split()[0].lower().rstrip("s,.;") in ACTION_VERBS:
+                bullets.append(line);  
+            if len(bullets)>=60: break
+    if len(bullets)<10:
+        head_rx=re.compile(r"^[ \t]*(?:[-–—•*]|[\u2022-\u2024])?[ \t]*"
+                           r"[A-Z][A-Za-z0-9 &/()+\-]{2,50}:\s+.+", re.M)
+        for m in head_rx.findall(clean):
+            line=m.strip(); 
+            if line not in bullets: bullets.append(line)
+            if len(bullets)>=60: break
+    return bullets[:60]
+
+def match_score(overlap:Iterable, jd_skills:Iterable)->int:
+    """The 'Match score' metric: % of JD skills found on the résumé."""
+    jd = list(jd_skills)
+    return int(100*len(list(overlap))/len(jd)) if jd else 0
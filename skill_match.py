@@ -0,0 +1,161 @@
+# ───────────────────────── skill_match.py ──────────────────────────
+# Fuzzy résumé × JD skill overlap.
+#
+#   skills ──char 3-gram TF-IDF (hashed)──▶ unit vectors
+#   S = R @ Jᵀ                              one matmul, |res| × |jd|
+#   + same skill (case-folded text or taxonomy alias: "ML" ⇄ "Machine
+#     Learning") set to 1.0; other initials hits ("AI" ⇄ "Adobe
+#     Illustrator") raised to ACRONYM_SIM, so they can still lose
+#   ──1:1 assignment (Hungarian), keep S ≥ threshold──▶ [SkillMatch]
+#
+# Everything is local: IDF weights come from the skill taxonomy's names
+# and aliases, n-grams are hashed into a fixed number of buckets, and
+# every skill string is embedded once per process.  `JDMatcher` keeps the
+# JD side fixed so batch screening only embeds each résumé's skills.
+# ─────────────────────────────────────────────────────────────────────
+from __future__ import annotations
+
+import re, threading, zlib
+from dataclasses import dataclass
+from typing import Iterable
+
+import numpy as np
+
+from skill_taxonomy import get_taxonomy
+
+NGRAM      = 3
+DIM        = 1 << 14                    # hashed n-gram buckets
+THRESHOLD  = 0.6                        # min cosine for a fuzzy hit
+ACRONYM_SIM = 0.7                       # initials ⇄ expansion the taxonomy doesn't confirm
+
+try:                                    # optimal 1:1 assignment when scipy is around
+    from scipy.optimize import linear_sum_assignment
+except ImportError:                     # pragma: no cover
+    linear_sum_assignment = None
+
+
+@dataclass(frozen=True)
+class SkillMatch:
+    resume: str
+    jd: str
+    score: float                        # cosine similarity, 1.0 = same skill
+
+
+# ─── features ───────────────────────────────────────────────────
+def _clean(skill: str) -> str:
+    return " ".join(re.findall(r"[a-z0-9+#.]+", skill.lower()))
+
+def _ngrams(skill: str) -> list[int]:
+    s = f" {_clean(skill)} "
+    return [zlib.crc32(s[i:i + NGRAM].encode()) % DIM
+            for i in range(max(len(s) - NGRAM + 1, 1))]
+
+def _initials(skill: str) -> str:
+    words = _clean(skill).split()
+    return "".join(w[0] for w in words) if len(words) > 1 else ""
+
+
+class SkillVectorizer:
+    """Hashed char n-gram TF-IDF with a per-process embedding cache."""
+
+    def __init__(self, corpus: Iterable[str] | None = None):
+        if corpus is None:
+            tx = get_taxonomy()
+            corpus = [*tx.names.values(), *tx.aliases()]
+        df = np.zeros(DIM, np.float32)
+        docs = 0
+        for term in corpus:
+            df[np.unique(_ngrams(term))] += 1; docs += 1
+        self.idf = np.log((1 + docs) / (1 + df)).astype(np.float32) + 1
+        self._cache: dict[str, tuple[np.ndarray, np.ndarray]] = {}   # skill → (idx, w)
+        self._lock = threading.Lock()
+
+    def _embed(self, skill: str) -> tuple[np.ndarray, np.ndarray]:
+        idx, tf = np.unique(_ngrams(skill), return_counts=True)
+        w = tf * self.idf[idx]
+        n = np.linalg.norm(w)
+        return idx, (w / n if n else w).astype(np.float32)
+
+    def transform(self, skills: list[str]) -> np.ndarray:
+        """(len(skills), DIM) L2-normalised rows (cached sparse, returned dense)."""
+        out = np.zeros((len(skills), DIM), np.float32)
+        with self._lock:
+            for k, s in enumerate(skills):
+                hit = self._cache.get(s)
+                if hit is None:
+                    hit = self._cache[s] = self._embed(s)
+                out[k, hit[0]] = hit[1]
+        return out
+
+
+_vectorizer: SkillVectorizer | None = None
+_vec_lock = threading.Lock()
+
+def get_vectorizer() -> SkillVectorizer:
+    global _vectorizer
+    with _vec_lock:
+        if _vectorizer is None:
+            _vectorizer = SkillVectorizer()
+        return _vectorizer
+
+
+# ─── matching ───────────────────────────────────────────────────
+def _assign(sim: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    if linear_sum_assignment is not None:
+        return linear_sum_assignment(sim, maximize=True)
+    rows, cols, used_r, used_c = [], [], set(), set()     # greedy, best pair first
+    for flat in np.argsort(-sim, axis=None):
+        i, j = divmod(int(flat), sim.shape[1])
+        if i not in used_r and j not in used_c:
+            rows.append(i); cols.append(j); used_r.add(i); used_c.add(j)
+    return np.array(rows, int), np.array(cols, int)
+
+
+class JDMatcher:
+    """JD skills embedded once; `match` many résumé skill sets against them."""
+
+    def __init__(self, jd_skills: Iterable[str], *, threshold: float = THRESHOLD,
+                 vectorizer: SkillVectorizer | None = None, taxonomy=None):
+        self.vec = vectorizer or get_vectorizer()
+        self.tx = taxonomy or get_taxonomy()
+        self.threshold = threshold
+        self.jd = sorted(set(jd_skills), key=str.lower)
+        self.J = self.vec.transform(self.jd)
+        self._jd_lower = np.array([_clean(s) for s in self.jd])
+        self._jd_initials = np.array([_initials(s) for s in self.jd])
+        self._jd_ids = np.array([self.tx.canonical_id(s) or "" for s in self.jd])
+
+    def similarity(self, res: list[str]) -> np.ndarray:
+        """|res| × |jd| cosine matrix; same skill → 1.0, unconfirmed acronyms → ACRONYM_SIM."""
+        sim = np.clip(self.vec.transform(res) @ self.J.T, 0.0, 1.0)
+        if res and self.jd:
+            lower = np.array([_clean(s) for s in res])
+            initials = np.array([_initials(s) for s in res])
+            ids = np.array([self.tx.canonical_id(s) or "" for s in res])
+            acro = (np.equal.outer(lower, self._jd_initials) & (self._jd_initials != "")[None]) | \
+                   (np.equal.outer(initials, self._jd_lower) & (initials != "")[:, None])
+            sim[acro] = np.maximum(sim[acro], ACRONYM_SIM)
+            sim[np.equal.outer(lower, self._jd_lower)] = 1.0    # float32 cosine is 0.99999994
+            sim[np.equal.outer(ids, self._jd_ids) & (ids != "")[:, None]] = 1.0
+        return sim
+
+    def match(self, res_skills: Iterable[str]) -> list[SkillMatch]:
+        """One-to-one résumé → JD pairs scoring ≥ threshold, best first."""
+        res = sorted(set(res_skills), key=str.lower)
+        if not res or not self.jd:
+            return []
+        sim = self.similarity(res)
+        rows, cols = _assign(sim)
+        out = [SkillMatch(res[i], self.jd[j], round(float(sim[i, j]), 3))
+               for i, j in zip(rows, cols) if sim[i, j] >= self.threshold]
+        return sorted(out, key=lambda m: (-m.score, m.jd.lower()))
+
+
+def match_skills(res_skills: Iterable[str], jd_skills: Iterable[str], *,
+                 threshold: float = THRESHOLD) -> list[SkillMatch]:
+    return JDMatcher(jd_skills, threshold=threshold).match(res_skills)
+
+
+def matched_jd(matches: Iterable[SkillMatch]) -> list[str]:
+    """The JD side of the matches, i.e. the fuzzy counterpart of `res & jd`."""
+    return sorted({m.jd for m in matches}, key=str.lower)
@@ -0,0 +1,226 @@
+# ───────────────────────── skill_taxonomy.py ─────────────────────────
+# Skill taxonomy (canonical names + aliases) compiled into a token trie.
+#
+#   data/skills_taxonomy.json  ──compile──▶  .cache/skills_taxonomy-<sha>.pkl
+#
+# Matching walks the trie from every token of the document, so the cost
+# is O(len(doc) × longest alias in tokens) – independent of how many
+# skills the taxonomy holds.  The compiled index is pickled next to the
+# source hash and reloaded in milliseconds on later starts.
+#
+# Case-sensitive aliases are letters or ordinary words ("C", "R", "Go",
+# "Swift", "Excel"), so in running text they only count in context:
+#   one letter   not followed by . & '   ("John C. Smith", "R&D", "Grade: C.")
+#   a word       not first in a sentence ("Go live…", "Excel in delivery")
+#                and not followed by a capitalised word ("Swift Logistics")
+# ─────────────────────────────────────────────────────────────────────
+from __future__ import annotations
+
+import csv, hashlib, json, os, pickle, re, threading
+from dataclasses import dataclass, field
+from pathlib import Path
+
+ROOT          = Path(__file__).resolve().parent
+TAXONOMY_PATH = Path(os.getenv("SKILLS_TAXONOMY", ROOT / "data" / "skills_taxonomy.json"))
+CACHE_DIR     = ROOT / ".cache"
+
+# tokens keep the characters skills are made of: c++, c#, node.js, .net
+_TOKEN = re.compile(r"\.?[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|\.?[a-z0-9][+#]*", re.I)
+
+_END  = ""                                  # trie key holding the canonical id
+_CASE = "\0"                                # …and, for "Go" / "R" / "C", the exact casing
+
+MATCHER_VERSION = 2                         # bump when compiling / matching rules change
+_PROPER_NEXT = re.compile(r"[ \t]+[A-Z][a-z]")
+
+
+def _in_context(text: str, start: int, end: int, exact: str) -> bool:
+    """Whether a case-sensitive alias at text[start:end] reads as a skill."""
+    if len(exact) == 1:
+        return text[end:end + 1] not in (".", "&", "'", "’")
+    if exact.isalpha() and exact.istitle():
+        before = text[:start].rstrip(" \t")
+        if not before or before[-1] in ".!?":
+            return False
+        return not _PROPER_NEXT.match(text, end)
+    return True                             # acronyms: "ML", "REST"
+
+
+def tokenize(text: str) -> list[re.Match]:
+    return list(_TOKEN.finditer(text))
+
+
+def _key(text: str) -> tuple[str, ...]:
+    return tuple(m.group().lower() for m in tokenize(text))
+
+
+@dataclass
+class TaxonomyIndex:
+    """Compiled taxonomy: trie over alias tokens + canonical id → display name."""
+    names: dict[str, str] = field(default_factory=dict)      # id → canonical name
+    trie: dict = field(default_factory=dict)
+    max_len: int = 0
+    source_sha: str = ""
+
+    # ── build ──
+    @classmethod
+    def from_entries(cls, entries: list[dict], source_sha: str = "") -> "TaxonomyIndex":
+        idx = cls(source_sha=source_sha)
+        for e in entries:
+            sid = e.get("id") or e["name"].lower()
+            idx.names[sid] = e["name"]
+            exact = set(e.get("case_sensitive", []))         # common words: "Go", "R"
+            for alias in [e["name"], *e.get("aliases", [])]:
+                toks = _key(alias)
+                if not toks:
+                    continue
+                node = idx.trie
+                for t in toks:
+                    node = node.setdefault(t, {})
+                if _END in node:                             # first entry wins
+                    continue
+                node[_END] = sid
+                if alias in exact:
+                    node[_CASE] = " ".join(m.group() for m in tokenize(alias))
+                idx.max_len = max(idx.max_len, len(toks))
+        return idx
+
+    @staticmethod
+    def _accepts(node: dict, toks: list[re.Match]) -> bool:
+        return _END in node and (_CASE not in node or
+                                 node[_CASE] == " ".join(m.group() for m in toks))
+
+    # ── lookups ──
+    def canonical_id(self, term: str) -> str | None:
+        """Exact (alias-aware) lookup of a whole term, e.g. 'k8s' → 'kubernetes'."""
+        toks, node = tokenize(term), self.trie
+        for m in toks:
+            node = node.get(m.group().lower())
+            if node is None:
+                return None
+        return node[_END] if toks and self._accepts(node, toks) else None
+
+    def needs_context(self, term: str) -> bool:
+        """Whether `term` is a case-sensitive alias ("C", "Go") that `find` guards."""
+        node = self.trie
+        for m in tokenize(term):
+            node = node.get(m.group().lower())
+            if node is None:
+                return False
+        return _CASE in node
+
+    def canonical_name(self, term: str) -> str | None:
+        sid = self.canonical_id(term)
+        return self.names[sid] if sid else None
+
+    def find(self, text: str) -> list[tuple[int, int, str]]:
+        """Leftmost-longest matches as (start_char, end_char, canonical id)."""
+        toks = tokenize(text)
+        out, i, n = [], 0, len(toks)
+        while i < n:
+            node, best, j = self.trie, None, i
+            while j < n and j - i < self.max_len:
+                node = node.get(toks[j].group().lower())
+                if node is None:
+                    break
+                j += 1
+                if self._accepts(node, toks[i:j]) and (
+                        _CASE not in node or
+                        _in_context(text, toks[i].start(), toks[j - 1].end(), node[_CASE])):
+                    best = (j, node[_END])
+            if best:
+                j, sid = best
+                out.append((toks[i].start(), toks[j - 1].end(), sid))
+                i = j
+            else:
+                i += 1
+        return out
+
+    def find_ids(self, text: str) -> set[str]:
+        return {sid for _, _, sid in self.find(text)}
+
+    def aliases(self) -> list[str]:
+        """Every compiled alias as lower-case, space-joined tokens."""
+        out, stack = [], [((), self.trie)]
+        while stack:
+            path, node = stack.pop()
+            if _END in node:
+                out.append(" ".join(path))
+            stack.extend((path + (t,), child) for t, child in node.items()
+                         if t not in (_END, _CASE))
+        return out
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+
+# ── taxonomy files ──────────────────────────────────────────────────────
+def read_entries(path: Path) -> list[dict]:
+    """.json: [{"id", "name", "aliases": [...], "case_sensitive": [...]}, …]
+    .csv: id,name,aliases,case_sensitive (lists | separated)"""
+    if path.suffix.lower() == ".csv":
+        def split(v): return [a for a in (v or "").split("|") if a]
+        with path.open(encoding="utf-8", newline="") as f:
+            return [{"id": r["id"], "name": r["name"], "aliases": split(r.get("aliases")),
+                     "case_sensitive": split(r.get("case_sensitive"))}
+                    for r in csv.DictReader(f)]
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def compile_taxonomy(path: Path = TAXONOMY_PATH, cache_dir: Path = CACHE_DIR) -> TaxonomyIndex:
+    """Load the compiled index for `path`, compiling (and pickling) it if stale."""
+    raw = Path(path).read_bytes()
+    sha = hashlib.sha256(raw + f"\0v{MATCHER_VERSION}".encode()).hexdigest()[:16]
+    compiled = Path(cache_dir) / f"{Path(path).stem}-{sha}.pkl"
+    if compiled.exists():
+        try:
+            with compiled.open("rb") as f:
+                return TaxonomyIndex(**pickle.load(f))
+        except Exception:                   # truncated / incompatible: rebuild
+            pass
+    idx = TaxonomyIndex.from_entries(read_entries(Path(path)), sha)
+    compiled.parent.mkdir(parents=True, exist_ok=True)
+    tmp = compiled.with_suffix(f".{os.getpid()}.tmp")
+    with tmp.open("wb") as f:
+        pickle.dump(vars(idx), f, protocol=pickle.HIGHEST_PROTOCOL)   # plain data only
+    os.replace(tmp, compiled)
+    return idx
+
+
+_index: TaxonomyIndex | None = None
+_index_lock = threading.Lock()
+
+def get_taxonomy() -> TaxonomyIndex:
+    """The process-wide compiled taxonomy."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = compile_taxonomy()
+        return _index
+
+
+# ordinary text that must not yield a skill (checked by `--check`)
+CONTEXT_CHECKS = [
+    ("John C. Smith", set()), ("in R&D", set()), ("R. Kumar", set()),
+    ("Grade: C.", set()), ("Go live next week.", set()), ("Shipped. Go live in May.", set()),
+    ("Excel in delivery", set()), ("worked at Swift Logistics", set()),
+    ("at Spring Corp since 2020", set()),
+    ("Languages: Go, Rust, C, R and Python.", {"go", "rust", "c", "r", "python"}),
+    ("Skills:\nGo\nSwift\nExcel", {"go", "swift", "excel"}),
+]
+
+
+if __name__ == "__main__":
+    # python skill_taxonomy.py [taxonomy.json|csv] [--check]  – compile and report
+    import sys, time
+    args = [a for a in sys.argv[1:] if a != "--check"]
+    src = Path(args[0]) if args else TAXONOMY_PATH
+    t0 = time.perf_counter(); idx = compile_taxonomy(src)
+    print(f"{len(idx)} skills, longest alias {idx.max_len} tokens, "
+          f"loaded in {1e3 * (time.perf_counter() - t0):.1f} ms")
+    if "--check" in sys.argv:
+        bad = [(text, idx.find_ids(text), want) for text, want in CONTEXT_CHECKS
+               if idx.find_ids(text) != want]
+        for text, got, want in bad:
+            print(f"FAIL {text!r}: got {sorted(got)}, want {sorted(want)}")
+        sys.exit(1 if bad else 0)
@@ -0,0 +1,103 @@
+# streaming_asr.py
+# --------------------------------------------------------------
+# Incremental faster-whisper transcription while the candidate speaks.
+#
+# Every `update()` re-decodes only the *uncommitted* tail of the
+# utterance.  Words on which two consecutive hypotheses agree
+# (local agreement, LCP of hyp[n-1] and hyp[n]) are committed and the
+# window is advanced past them.  At end of turn `finish()` decodes just
+# that last window, so ASR adds ~one short decode to the pause, not a
+# full pass over the whole answer.
+# --------------------------------------------------------------
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Literal
+
+import numpy as np
+
+
+@dataclass
+class Word:
+    start: float          # seconds from the start of the utterance
+    end: float
+    text: str
+
+    @property
+    def key(self) -> str:
+        return re.sub(r"[^\w']", "", self.text.lower())
+
+
+@dataclass
+class ASREvent:
+    kind: Literal["partial", "final"]
+    text: str             # committed + current hypothesis
+    committed: str        # stable prefix, will not change any more
+
+
+def _join(words: list[Word]) -> str:
+    return "".join(w.text for w in words).strip()
+
+
+class StreamingTranscriber:
+    """
+    Feed it the growing utterance (int16 or float32 PCM); get ASREvents back.
+
+    Not thread-safe: call `update`/`finish` from one worker (the ASR executor).
+    """
+
+    def __init__(self, model, fs: int = 16_000, *, max_window_s: float = 12.0,
+                 beam_size: int = 1):
+        self.model = model
+        self.fs = fs
+        self.max_window = int(max_window_s * fs)
+        self.beam_size = beam_size
+        self.reset()
+
+    def reset(self):
+        self.offset = 0                       # samples already committed
+        self.committed: list[Word] = []
+        self.hypothesis: list[Word] = []
+
+    # faster-whisper call on audio[offset:]
+    def _decode(self, audio: np.ndarray) -> list[Word]:
+        window = audio[self.offset:]
+        if window.dtype == np.int16:
+            window = window.astype(np.float32) / 32768
+        if len(window) < self.fs // 10:
+            return []
+        segs, _ = self.model.transcribe(
+            window, beam_size=self.beam_size, word_timestamps=True,
+            initial_prompt=_join(self.committed[-30:]) or None,
+            condition_on_previous_text=False)
+        t0 = self.offset / self.fs
+        return [Word(t0 + w.start, t0 + w.end, w.word)
+                for s in segs for w in (s.words or [])]
+
+    def update(self, audio: np.ndarray) -> ASREvent:
+        words = self._decode(audio)
+
+        agree = 0
+        for a, b in zip(self.hypothesis, words):
+            if a.key != b.key:
+                break
+            agree += 1
+        # a long window without agreement: commit all but the last words
+        if not agree and len(audio) - self.offset > self.max_window and len(words) > 2:
+            agree = len(words) - 2
+
+        if agree:
+            self.committed += words[:agree]
+            self.offset = min(int(words[agree - 1].end * self.fs), len(audio))
+        self.hypothesis = words[agree:]
+
+        stable = _join(self.committed)
+        return ASREvent("partial", (stable + " " + _join(self.hypothesis)).strip(), stable)
+
+    def finish(self, audio: np.ndarray) -> ASREvent:
+        """Decode the last window and close the utterance (state is reset)."""
+        words = self.committed + self._decode(audio)
+        text = _join(words)
+        self.reset()
+        return ASREvent("final", text, text)
@@ -0,0 +1,174 @@
+# ───────────────────────── tts_backends.py ─────────────────────────
+# One text-to-speech interface, two engines:
+#
+#   ElevenLabsTTS   cloud, streams PCM as it is generated
+#   CoquiTTS        local (Coqui TTS, glow-tts by default); the model is
+#                   loaded once through model_registry and every synthesis
+#                   runs on its single worker thread, so no network
+#                   round-trip for short lines and the pipeline runs offline
+#
+#   tts = get_tts()                  # $TTS_BACKEND: elevenlabs | coqui
+#   tts.synthesize(text) -> bytes    # whole line, 16-bit mono PCM
+#   tts.stream(text)     -> Iterator[bytes]
+#   tts.astream(text)    -> AsyncIterator[bytes]
+#   tts.to_wav(text, path)
+# ─────────────────────────────────────────────────────────────────────
+from __future__ import annotations
+
+import asyncio, os, threading, wave
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Iterator
+
+import numpy as np
+
+import model_registry
+from sentence_stream import split_sentences
+
+BACKEND          = os.getenv("TTS_BACKEND", "elevenlabs")
+ELEVEN_VOICE_ID  = os.getenv("ELEVEN_VOICE_ID", "UgBBYS2sOqTuMpoF3BR0")
+ELEVEN_MODEL     = "eleven_multilingual_v2"
+ELEVEN_SETTINGS  = dict(stability=0.5, similarity_boost=0.75)
+COQUI_MODEL      = os.getenv("COQUI_MODEL", "tts_models/en/ljspeech/glow-tts")
+
+
+class TTSBackend(ABC):
+    """16-bit mono PCM at `sample_rate`; subclasses implement `stream`."""
+    name = "base"
+    sample_rate = 24_000
+
+    @abstractmethod
+    def stream(self, text: str) -> Iterator[bytes]:
+        """PCM chunks for `text`, in order, as soon as each is available."""
+
+    def synthesize(self, text: str) -> bytes:
+        return b"".join(self.stream(text))
+
+    async def astream(self, text: str) -> AsyncIterator[bytes]:
+        """`stream` on a thread, chunks handed to the event loop as they arrive."""
+        loop, q = asyncio.get_running_loop(), asyncio.Queue()
+        def pump():
+            try:
+                for chunk in self.stream(text):
+                    loop.call_soon_threadsafe(q.put_nowait, chunk)
+            finally:
+                loop.call_soon_threadsafe(q.put_nowait, None)
+        fut = loop.run_in_executor(None, pump)
+        while (chunk := await q.get()) is not None:
+            yield chunk
+        await fut                                   # re-raise synthesis errors
+
+    def to_wav(self, text: str, wav_path) -> str:
+        pcm = self.synthesize(text)
+        with wave.open(str(wav_path), "wb") as wf:
+            wf.setnchannels(1)
+            wf.setsampwidth(2)                      # 16-bit
+            wf.setframerate(self.sample_rate)
+            wf.writeframes(pcm)
+        return str(wav_path)
+
+    def cache_id(self) -> tuple:
+        """Everything that changes the audio for a given text (media cache key)."""
+        return (self.name, self.sample_rate)
+
+
+# ── ElevenLabs ───────────────────────────────────────────────────
+class ElevenLabsTTS(TTSBackend):
+    name = "elevenlabs"
+
+    def __init__(self, voice_id: str = ELEVEN_VOICE_ID, *, model: str = ELEVEN_MODEL,
+                 settings: dict | None = None, sample_rate: int = 24_000):
+        self.voice_id, self.model = voice_id, model
+        self.settings = dict(ELEVEN_SETTINGS if settings is None else settings)
+        self.sample_rate = sample_rate
+        self._client = self._aclient = None
+        self._lock = threading.Lock()
+
+    def _api_key(self) -> str:
+        key = os.getenv("ELEVEN_API_KEY")
+        if not key:
+            raise RuntimeError("ELEVEN_API_KEY env-var missing")
+        return key
+
+    def _kw(self, text: str) -> dict:
+        from elevenlabs import VoiceSettings                # deferred: slow import
+        kw = dict(voice_id=self.voice_id, text=text, model_id=self.model,
+                  output_format=f"pcm_{self.sample_rate}")
+        if self.settings:                                   # {} → the voice's own defaults
+            kw["voice_settings"] = VoiceSettings(**self.settings)
+        return kw
+
+    def stream(self, text: str) -> Iterator[bytes]:
+        with self._lock:
+            if self._client is None:
+                from elevenlabs import ElevenLabs
+                self._client = ElevenLabs(api_key=self._api_key())
+        yield from self._client.text_to_speech.stream(**self._kw(text))
+
+    async def astream(self, text: str) -> AsyncIterator[bytes]:
+        if self._aclient is None:                           # bound to the caller's loop
+            from elevenlabs import AsyncElevenLabs
+            self._aclient = AsyncElevenLabs(api_key=self._api_key())
+        async for chunk in self._aclient.text_to_speech.stream(**self._kw(text)):
+            yield chunk
+
+    def cache_id(self) -> tuple:
+        return (self.name, self.voice_id, self.settings, self.model, self.sample_rate)
+
+
+# ── Coqui (local) ────────────────────────────────────────────────
+def _load_coqui():
+    from TTS.api import TTS
+    return TTS(model_name=COQUI_MODEL, progress_bar=False)
+
+model_registry.register("coqui", _load_coqui)
+
+
+class CoquiTTS(TTSBackend):
+    """Local synthesis; one sentence at a time so streaming starts after the first."""
+    name = "coqui"
+
+    # the model is not thread-safe: every call runs on this one thread
+    _pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="coqui")
+
+    def __init__(self, speaker: str | None = None):
+        self.speaker = speaker
+
+    @property
+    def sample_rate(self) -> int:
+        return model_registry.get("coqui").synthesizer.output_sample_rate
+
+    def _run(self, text: str) -> bytes:
+        tts = model_registry.get("coqui")
+        wav = np.asarray(tts.tts(text=text, speaker=self.speaker), dtype=np.float32)
+        return (np.clip(wav, -1.0, 1.0) * 32767).astype(np.int16).tobytes()
+
+    def stream(self, text: str) -> Iterator[bytes]:
+        futs = [self._pool.submit(self._run, s) for s in split_sentences(text)]
+        for fut in futs:                            # queued in order on one thread
+            yield fut.result()
+
+    def cache_id(self) -> tuple:
+        return (self.name, COQUI_MODEL, self.speaker)
+
+
+# ── selection ────────────────────────────────────────────────────
+_BACKENDS = {"elevenlabs": ElevenLabsTTS, "coqui": CoquiTTS}
+_instances: dict[tuple, TTSBackend] = {}
+_instances_lock = threading.Lock()
+
+def get_tts(name: str | None = None, **kw) -> TTSBackend:
+    """Shared backend instance per (name, options); default from $TTS_BACKEND."""
+    name = name or BACKEND
+    key = (name, tuple(sorted((k, repr(v)) for k, v in kw.items())))
+    with _instances_lock:
+        if key not in _instances:
+            if name not in _BACKENDS:
+                raise ValueError(f"unknown TTS backend {name!r} (have {sorted(_BACKENDS)})")
+            _instances[key] = _BACKENDS[name](**kw)
+        return _instances[key]
+
+
+def warm_models() -> tuple[str, ...]:
+    """model_registry names the selected backend wants warmed."""
+    return ("coqui",) if BACKEND == "coqui" else ()
@@ -0,0 +1,183 @@
+# utterance_segmenter.py
+# --------------------------------------------------------------
+# Mic blocks in, whole utterances out – without per-block allocation.
+#
+#   idle   : blocks go into a small pre-roll ring (the ~300 ms before
+#            speech is detected, so the first syllable isn't clipped)
+#   speech : pre-roll is copied once, then blocks are appended into a
+#            preallocated buffer until `hangover` of silence (or max length)
+#   done   : a read-only view of that buffer is returned (zero copy)
+# --------------------------------------------------------------
+from __future__ import annotations
+import math
+import numpy as np
+
+
+class EnergyVAD:
+    """
+    Block RMS in dBFS against an adaptive noise floor.
+
+    Cheaper than `np.abs(pcm).mean()` (one int64 dot product, no temporary
+    array) and robust to mic gain / room noise: the threshold is relative
+    to the floor, with hysteresis so speech doesn't flicker on soft syllables.
+
+    The floor is calibrated from the first `calib_ms` of audio (loudest
+    block, reported as silence).  Steady noise that starts later keeps the
+    VAD active; after `max_active_s` the floor jumps to the quietest block
+    of that stretch – the pauses between words for real speech, the noise
+    itself otherwise.
+    """
+
+    def __init__(self, start_db: float = 12.0, stop_db: float = 6.0,
+                 floor_db: float = -60.0, attack: float = 0.5, release: float = 0.02,
+                 *, fs: int = 16_000, calib_ms: int = 300, max_active_s: float = 5.0):
+        self.start_db, self.stop_db = start_db, stop_db
+        self.floor = floor_db
+        self.attack, self.release = attack, release   # floor falls fast, rises slow
+        self.active = False
+        self._calib = fs * calib_ms // 1000           # samples still to calibrate on
+        self._calib_db = -math.inf
+        self._max_active = int(fs * max_active_s)
+        self._active_n = 0                            # samples in this active stretch
+        self._active_min = math.inf                   # quietest block in it
+
+    @staticmethod
+    def level_db(pcm: np.ndarray) -> float:
+        energy = np.dot(pcm, pcm) if pcm.dtype != np.int16 else \
+                 np.einsum("i,i->", pcm, pcm, dtype=np.int64)
+        rms = math.sqrt(energy / max(len(pcm), 1)) / 32768.0
+        return 20 * math.log10(rms + 1e-9)
+
+    def __call__(self, pcm: np.ndarray) -> bool:
+        db = self.level_db(pcm)
+        if self._calib > 0:                          # room noise before anyone speaks
+            self._calib -= len(pcm)
+            self._calib_db = max(self._calib_db, db)
+            if self._calib <= 0:
+                self.floor = self._calib_db
+            return False
+        above = db - self.floor
+        self.active = above > (self.stop_db if self.active else self.start_db)
+        if not self.active:                          # track the noise floor
+            rate = self.attack if db < self.floor else self.release
+            self.floor += rate * (db - self.floor)
+            self._active_n, self._active_min = 0, math.inf
+            return False
+        self._active_n += len(pcm)
+        self._active_min = min(self._active_min, db)
+        if self._active_n >= self._max_active:       # active too long: re-estimate
+            self.floor = max(self.floor, self._active_min)
+            self._active_n, self._active_min = 0, math.inf
+        return self.active
+
+
+class UtteranceSegmenter:
+    """
+    push(int16 block) -> read-only view of a finished utterance, or None.
+
+    Two buffers alternate, so a returned view stays valid until the *next*
+    utterance has been completed as well – long enough to hand it to ASR.
+    """
+
+    def __init__(self, fs: int = 16_000, *, max_s: float = 30.0,
+                 preroll_ms: int = 300, hangover_ms: int = 600,
+                 min_speech_ms: int = 200, vad: EnergyVAD | None = None):
+        self.fs = fs
+        self.vad = vad or EnergyVAD(fs=fs)
+        self.preroll  = fs * preroll_ms // 1000
+        self.hangover = fs * hangover_ms // 1000
+        self.min_speech = fs * min_speech_ms // 1000
+        cap = self.preroll + int(fs * max_s)
+
+        self._ring = np.zeros(self.preroll, dtype=np.int16)
+        self._ring_pos = 0
+        self._ring_fill = 0
+        self._bufs = (np.empty(cap, dtype=np.int16), np.empty(cap, dtype=np.int16))
+        self._cur = 0
+        self._n = 0                      # samples in the current utterance
+        self._voiced = 0                 # voiced samples in it
+        self._silent = 0                 # trailing silence
+        self.in_speech = False
+
+    @property
+    def capacity(self) -> int:
+        return len(self._bufs[0])
+
+    @property
+    def samples(self) -> int:
+        """Samples in the utterance being recorded (0 when idle)."""
+        return self._n if self.in_speech else 0
+
+    def current(self) -> np.ndarray | None:
+        """Read-only view of the utterance so far (for streaming ASR), or None."""
+        if not self.in_speech:
+            return None
+        view = self._bufs[self._cur][:self._n]
+        view.flags.writeable = False
+        return view
+
+    def reset(self):
+        self._n = self._voiced = self._silent = 0
+        self._ring_fill = 0
+        self.in_speech = False
+
+    def push(self, pcm: np.ndarray) -> np.ndarray | None:
+        voiced = self.vad(pcm)
+        if not self.in_speech:
+            if not voiced:
+                self._to_ring(pcm)
+                return None
+            self._start()
+
+        buf = self._bufs[self._cur]
+        take = min(len(pcm), self.capacity - self._n)
+        buf[self._n:self._n + take] = pcm[:take]
+        self._n += take
+        if voiced:
+            self._voiced += take
+            self._silent = 0
+        else:
+            self._silent += take
+
+        if self._silent >= self.hangover or self._n >= self.capacity:
+            return self._finish()
+        return None
+
+    def flush(self) -> np.ndarray | None:
+        """Close an utterance still in progress (e.g. on shutdown)."""
+        return self._finish() if self.in_speech else None
+
+    # internals
+    def _to_ring(self, pcm: np.ndarray):
+        if self.preroll == 0:
+            return
+        pcm = pcm[-self.preroll:]
+        end = self._ring_pos + len(pcm)
+        if end <= self.preroll:
+            self._ring[self._ring_pos:end] = pcm
+        else:
+            split = self.preroll - self._ring_pos
+            self._ring[self._ring_pos:] = pcm[:split]
+            self._ring[:end - self.preroll] = pcm[split:]
+        self._ring_pos = end % self.preroll
+        self._ring_fill = min(self._ring_fill + len(pcm), self.preroll)
+
+    def _start(self):
+        buf = self._bufs[self._cur]
+        k = self._ring_fill                              # oldest → newest
+        start = (self._ring_pos - k) % self.preroll if self.preroll else 0
+        first = min(k, self.preroll - start)
+        buf[:first] = self._ring[start:start + first]
+        buf[first:k] = self._ring[:k - first]
+        self._n, self._voiced, self._silent = k, 0, 0
+        self.in_speech = True
+
+    def _finish(self) -> np.ndarray | None:
+        n, voiced = self._n, self._voiced
+        out = self._bufs[self._cur][:n]
+        self.reset()
+        if voiced < self.min_speech:                 # a click or a cough
+            return None
+        self._cur ^= 1                               # next utterance uses the other buffer
+        out.flags.writeable = False
+        return out